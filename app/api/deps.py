@@ -104,3 +104,14 @@ def get_verified_almacen(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tiene permiso para operar sobre este almacén."
         )
+
+def scope_almacen(almacen_id: int | None, current_user: "Users") -> int | None:
+    """
+    Almacén a usar en una consulta filtrable por almacén. El admin puede pedir cualquiera
+    (o None = todos); el resto solo el suyo (por defecto, el suyo).
+    """
+    if current_user.rol == 'admin':
+        return almacen_id
+    if current_user.almacen_id is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="El usuario no tiene almacén asignado.")
+    return get_verified_almacen(almacen_id or current_user.almacen_id, current_user)
@@ -5,6 +5,7 @@ from typing import List, Any
 from app import crud, models, schemas # Importar crud completo
 from app.api import deps
 from decimal import Decimal # Para saldo pendiente
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -43,6 +44,30 @@ def create_cliente(
     """Crea un nuevo cliente."""
     cliente = crud.crud_cliente.create_cliente(db=db, cliente=cliente_in)
     return cliente
+@router.get("/por-visitar", response_model=List[schemas.ClientePorVisitar])
+def read_clientes_por_visitar(
+    db: Session = Depends(deps.get_db),
+    almacen_id: int | None = Query(default=None, description="ID de almacén (por defecto, el del usuario)"),
+    dias: int = Query(default=0, ge=0, le=30, description="Incluir también las compras esperadas en los próximos N días"),
+    limit: int = Query(default=100, le=500),
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Lista de visitas: clientes cuya próxima compra esperada ya llegó (o llega en `dias`),
+    ordenados por atraso. Lee proxima_compra/kg_esperado del pronóstico por lotes
+    ('python manage.py pronosticar-reposicion').
+    """
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    hoy = datetime.now(timezone.utc).date()
+    clientes = crud.crud_cliente.get_clientes_por_visitar(
+        db, hasta=hoy + timedelta(days=dias), almacen_id=almacen_id, limit=limit
+    )
+    resultado = []
+    for cliente in clientes:
+        fila = schemas.ClientePorVisitar.model_validate(cliente)
+        fila.dias_atraso = max((hoy - cliente.proxima_compra).days, 0)
+        resultado.append(fila)
+    return resultado
 @router.get("/{cliente_id}", response_model=schemas.Cliente)
 def read_cliente_by_id(
     cliente_id: int,
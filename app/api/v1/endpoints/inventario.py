@@ -1,9 +1,16 @@
 # app/api/v1/endpoints/inventario.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Any
+from datetime import datetime, timezone
 from app import crud, models, schemas, services
 from app.api import deps
+from app.core.config import settings
+from app.utils.cache import TTLCache
+import csv
+import hashlib
+import io
+import json
 import logging
 from typing import TYPE_CHECKING
 
@@ -14,6 +21,25 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+_valuacion_cache = TTLCache(ttl_seconds=settings.CACHE_TTL_SECONDS)
+_matriz_cache = TTLCache(ttl_seconds=settings.CACHE_TTL_SECONDS)
+
+
+def _build_matriz(db: Session, producto_id: int | None, tipo: str | None) -> tuple[dict, str]:
+    """Pivota el stock a presentaciones x almacenes y calcula su ETag."""
+    filas = crud.crud_inventario.get_cantidades_matriz(db, producto_id=producto_id, tipo=tipo)
+    presentacion_ids = sorted({f.presentacion_id for f in filas})
+    almacen_ids = sorted({f.almacen_id for f in filas})
+    idx_fila = {pid: i for i, pid in enumerate(presentacion_ids)}
+    idx_col = {aid: j for j, aid in enumerate(almacen_ids)}
+    n_cols = len(almacen_ids)
+    cantidades = [0] * (len(presentacion_ids) * n_cols)
+    for f in filas:
+        cantidades[idx_fila[f.presentacion_id] * n_cols + idx_col[f.almacen_id]] = f.cantidad
+    matriz = {"presentacion_ids": presentacion_ids, "almacen_ids": almacen_ids, "cantidades": cantidades}
+    etag = '"' + hashlib.sha1(json.dumps(matriz, separators=(",", ":")).encode()).hexdigest() + '"'
+    return matriz, etag
+
 @router.get("/", response_model=List[schemas.Inventario])
 def read_inventarios(
     db: Session = Depends(deps.get_db),
@@ -36,6 +62,178 @@ def read_inventarios(
     inventarios = crud.crud_inventario.get_inventarios(db, skip=skip, limit=limit, almacen_id=almacen_id)
     return inventarios
 
+@router.get("/alertas", response_model=List[schemas.Inventario])
+def read_alertas(
+    db: Session = Depends(deps.get_db),
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    desde: datetime | None = Query(default=None, description="Solo alertas iniciadas desde esta fecha (para consultas periódicas)"),
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """Registros de inventario con stock por debajo del mínimo, más recientes primero."""
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    return crud.crud_inventario.get_alertas(db, almacen_id=almacen_id, desde=desde)
+
+@router.get("/matriz", response_model=schemas.InventarioMatriz)
+def read_matriz(
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    producto_id: int | None = Query(default=None, description="Filtrar por ID de producto"),
+    tipo: str | None = Query(default=None, description="Filtrar por tipo de presentación"),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Stock de todas las presentaciones activas en todos los almacenes como matriz densa.
+    Soporta revalidación con If-None-Match (responde 304 si no hubo cambios).
+    """
+    matriz, etag = _matriz_cache.get_or_set(
+        (producto_id, tipo), lambda: _build_matriz(db, producto_id, tipo)
+    )
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={settings.CACHE_TTL_SECONDS}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return matriz
+
+@router.get("/historico", response_model=List[schemas.InventarioHistorico])
+def read_stock_historico(
+    db: Session = Depends(deps.get_db),
+    fecha: datetime = Query(..., description="Momento a consultar (ISO 8601)"),
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    presentacion_id: int | None = Query(default=None, description="Filtrar por ID de presentación"),
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """Stock en una fecha pasada: foto más cercana anterior + movimientos posteriores."""
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return services.service_inventario.get_stock_as_of(
+        db, fecha, almacen_id=almacen_id, presentacion_id=presentacion_id
+    )
+
+@router.post("/cierres", response_model=List[schemas.InventarioSnapshot])
+def create_cierre_mensual(
+    *,
+    db: Session = Depends(deps.get_db),
+    anio: int = Query(..., ge=2000, le=2100),
+    mes: int = Query(..., ge=1, le=12),
+    almacen_id: int | None = Query(default=None, description="Filtrar la respuesta por ID de almacén"),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Genera (o regenera) la foto de inventario al cierre del mes y la devuelve.
+    La foto se guarda para todos los almacenes; `almacen_id` solo filtra la respuesta.
+    """
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    fecha_cierre = services.service_inventario.close_month(db, anio, mes)
+    return crud.crud_inventario.get_snapshots(db, fecha_cierre, almacen_id=almacen_id)
+
+@router.post("/transferencias", response_model=schemas.Transferencia, status_code=status.HTTP_201_CREATED)
+def create_transferencia(
+    *,
+    db: Session = Depends(deps.get_db),
+    transferencia_in: schemas.TransferenciaCreate,
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """Transfiere stock de varias presentaciones entre dos almacenes en una sola operación."""
+    # El gerente solo puede despachar desde su almacén
+    deps.get_verified_almacen(transferencia_in.almacen_origen_id, current_user)
+    return services.service_inventario.transfer_stock(
+        db=db, transferencia=transferencia_in, current_user_id=current_user.id
+    )
+
+@router.get("/transferencias/sugeridas", response_model=List[schemas.TransferenciaSugerida])
+def read_transferencias_sugeridas(
+    db: Session = Depends(deps.get_db),
+    dias: int = Query(default=14, ge=1, le=90, description="Horizonte de la proyección de stock"),
+    presentacion_id: int | None = Query(default=None, description="Filtrar por ID de presentación"),
+    limit: int = Query(default=100, le=1000),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Transferencias sugeridas entre almacenes, de la más urgente a la menos: mueven excedentes
+    hacia almacenes que quedarían bajo el stock mínimo según el pronóstico de demanda.
+    El gerente solo ve las que salen de o llegan a su almacén.
+    """
+    almacen_id = deps.scope_almacen(None, current_user)
+    sugerencias = services.service_inventario.suggest_rebalanceo(db, dias=dias, presentacion_id=presentacion_id)
+    if almacen_id:
+        sugerencias = [
+            s for s in sugerencias if almacen_id in (s["almacen_origen_id"], s["almacen_destino_id"])
+        ]
+    return sugerencias[:limit]
+
+@router.post("/conteos", response_model=schemas.ConteoResultado)
+def create_conteo(
+    *,
+    db: Session = Depends(deps.get_db),
+    conteo_in: schemas.ConteoCreate,
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Aplica un conteo físico de un almacén en bloque (ajusta inventario y crea movimientos).
+    Con `simular` solo devuelve el reporte de diferencias.
+    """
+    deps.get_verified_almacen(conteo_in.almacen_id, current_user)
+    conteo = {}
+    for item in conteo_in.items:
+        conteo[item.presentacion_id] = conteo.get(item.presentacion_id, 0) + item.cantidad
+    return services.service_inventario.apply_stocktake(
+        db, conteo_in.almacen_id, conteo, simular=conteo_in.simular, current_user_id=current_user.id
+    )
+
+@router.post("/conteos/csv", response_model=schemas.ConteoResultado)
+def create_conteo_csv(
+    *,
+    db: Session = Depends(deps.get_db),
+    almacen_id: int = Form(...),
+    simular: bool = Form(False),
+    archivo: UploadFile = File(..., description="CSV con columnas presentacion_id,cantidad"),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """Igual que POST /conteos, pero recibe el conteo como archivo CSV."""
+    deps.get_verified_almacen(almacen_id, current_user)
+    contenido = archivo.file.read().decode("utf-8-sig")
+    conteo = {}
+    try:
+        for num_linea, fila in enumerate(csv.DictReader(io.StringIO(contenido)), start=2):
+            cantidad = int(fila["cantidad"])
+            if cantidad < 0:
+                raise ValueError(f"cantidad negativa en la línea {num_linea}")
+            presentacion_id = int(fila["presentacion_id"])
+            conteo[presentacion_id] = conteo.get(presentacion_id, 0) + cantidad
+    except (KeyError, ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"CSV inválido: {e}")
+    if not conteo:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El CSV no contiene filas.")
+    return services.service_inventario.apply_stocktake(
+        db, almacen_id, conteo, simular=simular, current_user_id=current_user.id
+    )
+
+@router.get("/valuacion", response_model=List[schemas.InventarioValuacion])
+def read_valuacion(
+    db: Session = Depends(deps.get_db),
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    refrescar: bool = Query(default=False, description="Ignorar la caché y recalcular"),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Valuación del stock (unidades, kg, valor a precio de venta y costo estimado)
+    agrupada por almacén, producto y tipo de presentación.
+    El resultado se cachea unos segundos (CACHE_TTL_SECONDS).
+    """
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+
+    def calcular():
+        filas = crud.crud_inventario.get_valuacion(db, almacen_id=almacen_id)
+        return [schemas.InventarioValuacion.model_validate(fila) for fila in filas]
+
+    if refrescar:
+        resultado = calcular()
+        _valuacion_cache.set(almacen_id, resultado)
+        return resultado
+    return _valuacion_cache.get_or_set(almacen_id, calcular)
+
 @router.post("/", response_model=schemas.Inventario, status_code=status.HTTP_201_CREATED)
 def create_inventario_entry(
     *,
@@ -45,6 +45,30 @@ def create_lote(
     lote = crud.crud_lote.create_lote(db=db, lote=lote_in)
     return lote
 
+@router.get("/rendimiento", response_model=List[schemas.LoteRendimiento])
+def read_rendimiento_lotes(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+    producto_id: int | None = Query(default=None),
+    proveedor_id: int | None = Query(default=None),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Rendimiento por lote: secado (húmedo vs. seco), mermas, briquetas y kg vendidos.
+    Se lee de una vista materializada que se refresca tras cada merma y cada noche.
+    """
+    return crud.crud_lote.get_rendimiento_lotes(db, skip=skip, limit=limit, producto_id=producto_id, proveedor_id=proveedor_id)
+
+@router.get("/rendimiento/proveedores", response_model=List[schemas.ProveedorRendimiento])
+def read_rendimiento_proveedores(
+    db: Session = Depends(deps.get_db),
+    producto_id: int | None = Query(default=None),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """Calidad por proveedor: rendimiento de secado y tasa de merma de todos sus lotes."""
+    return crud.crud_lote.get_rendimiento_proveedores(db, producto_id=producto_id)
+
 @router.get("/{lote_id}", response_model=schemas.Lote)
 def read_lote_by_id(
     lote_id: int,
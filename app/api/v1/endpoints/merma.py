@@ -51,6 +51,22 @@ def create_merma(
         logger.error(f"Error inesperado en create_merma endpoint: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al crear la merma.")
 
+@router.post("/batch", response_model=schemas.MermaBatchResult)
+def create_mermas_batch(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: schemas.MermaBatchCreate,
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Registra varias mermas de una vez (ej: limpieza de fin de día).
+    Las mermas válidas se guardan juntas; las inválidas se devuelven en `errores`.
+    """
+    creadas, errores = services.service_merma.create_mermas_batch(
+        db=db, mermas=batch_in.mermas, current_user_id=current_user.id
+    )
+    return {"creadas": creadas, "errores": errores}
+
 @router.get("/{merma_id}", response_model=schemas.Merma)
 def read_merma_by_id(
     merma_id: int,
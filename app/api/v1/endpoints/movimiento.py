@@ -1,9 +1,16 @@
 # app/api/v1/endpoints/movimiento.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Any, Optional
-from app import crud, models, schemas
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from app import crud, models, schemas, services
 from app.api import deps
+from app.db.session import SessionLocal
+import csv
+import io
+import json
 import logging
 from typing import TYPE_CHECKING
 
@@ -22,20 +29,93 @@ def read_movimientos(
     presentacion_id: int | None = Query(default=None),
     lote_id: int | None = Query(default=None),
     tipo: str | None = Query(default=None, pattern="^(entrada|salida)$"),
-    # Añadir filtros por fecha, usuario, almacén (requiere join o info en movimiento)
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    fecha_desde: datetime | None = Query(default=None, description="Desde (incluida)"),
+    fecha_hasta: datetime | None = Query(default=None, description="Hasta (excluida)"),
     current_user: "Users" = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Recupera lista de movimientos."""
-    # Añadir lógica de autorización (ej: solo movimientos de su almacén)
+    """Recupera lista de movimientos. Los usuarios no admin solo ven los de su almacén."""
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
     filters = {
         "presentacion_id": presentacion_id,
         "lote_id": lote_id,
         "tipo": tipo,
+        "almacen_id": almacen_id,
+        "fecha_desde": fecha_desde,
+        "fecha_hasta": fecha_hasta,
     }
     active_filters = {k: v for k, v in filters.items() if v is not None}
     movimientos = crud.crud_movimiento.get_movimientos(db, skip=skip, limit=limit, **active_filters)
     return movimientos
 
+KARDEX_COLUMNAS = ("id", "fecha", "tipo", "cantidad", "lote_id", "usuario_id", "motivo", "saldo")
+
+def _stream_kardex(stmt, formato: str):
+    """
+    Genera el kardex por bloques con un cursor del servidor. Usa su propia sesión:
+    la de la petición se cierra antes de que termine de enviarse la respuesta.
+    """
+    db = SessionLocal()
+    try:
+        if formato == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(KARDEX_COLUMNAS)
+            yield buffer.getvalue()
+        for partition in db.execute(stmt, execution_options={"yield_per": 1000}).partitions():
+            if formato == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in partition:
+                    writer.writerow(row)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(row._asdict(), default=str) + "\n" for row in partition)
+    finally:
+        db.close()
+
+@router.get("/kardex")
+def read_kardex(
+    db: Session = Depends(deps.get_db),
+    presentacion_id: int = Query(...),
+    almacen_id: int = Query(...),
+    fecha_desde: datetime | None = Query(default=None, description="Desde (incluida). Sin fecha: desde la foto de inventario más antigua"),
+    fecha_hasta: datetime | None = Query(default=None, description="Hasta (excluida)"),
+    formato: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Kardex (tarjeta de existencias) de una presentación en un almacén: cada entrada/salida
+    con su saldo. El saldo inicial sale de la foto de inventario más cercana, así que
+    no se recorre el historial anterior a `fecha_desde`. Sin `fecha_desde` parte de la
+    foto más antigua (el saldo nunca arranca en 0 a mitad del historial). Se envía en streaming.
+    """
+    deps.get_verified_almacen(almacen_id, current_user)
+    saldo_inicial = Decimal(0)
+    if fecha_desde is None:
+        apertura = crud.crud_inventario.get_primer_snapshot(db, presentacion_id=presentacion_id, almacen_id=almacen_id)
+        if apertura:
+            # La foto incluye todo hasta tomado_en: el kardex sigue con lo posterior
+            saldo_inicial = Decimal(apertura.cantidad)
+            fecha_desde = apertura.tomado_en + timedelta(microseconds=1)
+    else:
+        if fecha_desde.tzinfo is None:
+            fecha_desde = fecha_desde.replace(tzinfo=timezone.utc)
+        anterior = services.service_inventario.get_stock_as_of(
+            db, fecha_desde - timedelta(microseconds=1), almacen_id=almacen_id, presentacion_id=presentacion_id
+        )
+        saldo_inicial = Decimal(anterior[0]["cantidad"]) if anterior else Decimal(0)
+    if fecha_hasta and fecha_hasta.tzinfo is None:
+        fecha_hasta = fecha_hasta.replace(tzinfo=timezone.utc)
+
+    stmt = crud.crud_movimiento.kardex_statement(
+        presentacion_id, almacen_id, saldo_inicial=saldo_inicial, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta
+    )
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_kardex(stmt, formato), media_type=media_type, headers={"X-Saldo-Inicial": str(saldo_inicial)}
+    )
+
 @router.get("/{movimiento_id}", response_model=schemas.Movimiento)
 def read_movimiento_by_id(
     movimiento_id: int,
@@ -46,7 +126,8 @@ def read_movimiento_by_id(
     movimiento = crud.crud_movimiento.get_movimiento(db, movimiento_id=movimiento_id)
     if not movimiento:
         raise HTTPException(status_code=404, detail="Movimiento no encontrado")
-    # Añadir lógica de autorización (ej: almacén)
+    if current_user.rol != 'admin' and movimiento.almacen_id != current_user.almacen_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No tiene permiso para ver este movimiento.")
     return movimiento
 
 # POST, PUT, DELETE para Movimiento usualmente no se exponen directamente,
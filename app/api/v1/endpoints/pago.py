@@ -79,6 +79,8 @@ async def create_pago( # <--- async def
         pago = services.service_pago.create_pago_and_update_venta(
             db=db, pago_in=pago_in, usuario_id=current_user.id
         )
+        if file_url:
+            services.service_archivo.schedule_processing("pago", pago.id) # Miniaturas y deduplicación
         return pago
     except HTTPException as http_exc:
         # Si el servicio lanza HTTPException (ej: error interno), relanzar
@@ -89,7 +91,7 @@ async def create_pago( # <--- async def
         # Borrar archivo subido si la operación falló después de subirlo
         if file_url:
             # Usar prefijo del módulo
-            file_handling.delete_file(file_url)
+            await file_handling.delete_file_async(file_url)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al crear el pago.")
 
 
@@ -136,9 +138,6 @@ async def update_pago( # <--- async def
         file_url = await file_handling.save_upload_file(upload_file=file, destination="comprobantes")
         if not file_url:
              raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo guardar el nuevo comprobante.")
-        if old_file_url and old_file_url != file_url:
-             # Usar prefijo del módulo
-             file_handling.delete_file(old_file_url) # <--- CAMBIO DE LLAMADA
 
     # Crear el objeto de actualización Pydantic
     pago_in = schemas.PagoUpdate(
@@ -146,8 +145,57 @@ async def update_pago( # <--- async def
         url_comprobante=file_url # Actualizar con la nueva URL (o la antigua si no cambió)
     )
 
+    # El comprobante anterior se elimina en segundo plano (outbox en la misma transacción)
+    if file_url != old_file_url:
+        services.service_archivo.enqueue_deletion(db, old_file_url)
+
     # Llamar al CRUD simple para actualizar
     updated_pago = crud.crud_pago.update_pago_simple(db=db, db_obj=pago, obj_in=pago_in)
+    if file_url != old_file_url:
+        services.service_archivo.schedule_processing("pago", updated_pago.id)
+        services.service_archivo.schedule_drain()
+    return updated_pago
+
+@router.put("/{pago_id}/comprobante", response_model=schemas.Pago)
+async def confirm_comprobante(
+    *,
+    db: Session = Depends(deps.get_db),
+    pago_id: int,
+    upload_in: schemas.UploadConfirm,
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Asocia al pago un comprobante subido con URL firmada (POST /uploads/presign).
+    Verifica tamaño y tipo del archivo antes de guardarlo.
+    """
+    pago = crud.crud_pago.get_pago(db, pago_id=pago_id)
+    if not pago:
+        raise HTTPException(status_code=404, detail="Pago no encontrado")
+    deps.get_verified_almacen(pago.venta.almacen_id, current_user)
+
+    try:
+        file_url = await file_handling.confirm_uploaded_file(
+            upload_in.key, destination="comprobantes", token=upload_in.token, user_id=current_user.id
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Una subida se confirma una sola vez: dos filas con la misma key romperían la limpieza de archivos
+    if db.query(models.Pago.id).filter(
+        models.Pago.url_comprobante == file_url, models.Pago.id != pago_id
+    ).first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El archivo ya está asociado a otro registro.")
+
+    old_file_url = pago.url_comprobante
+    if old_file_url != file_url:
+        services.service_archivo.enqueue_deletion(db, old_file_url)
+    updated_pago = crud.crud_pago.update_pago_simple(
+        db=db, db_obj=pago, obj_in={"url_comprobante": file_url}
+    )
+    if old_file_url != file_url:
+        services.service_archivo.schedule_processing("pago", updated_pago.id)
+        services.service_archivo.schedule_drain()
     return updated_pago
 
 @router.delete("/{pago_id}", response_model=schemas.Pago)
@@ -164,14 +212,11 @@ def delete_pago(
     # Verificar permiso sobre el almacén de la venta asociada
     deps.get_verified_almacen(pago.venta.almacen_id, current_user)
 
-    file_to_delete = pago.url_comprobante # Guardar URL antes de llamar al servicio
-
     try:
+        # El servicio encola la eliminación del comprobante en la misma transacción
         deleted_pago = services.service_pago.delete_pago_and_update_venta(db=db, pago_id=pago_id)
-        # Si la operación de BD fue exitosa, eliminar archivo
-        if file_to_delete:
-            # Usar prefijo del módulo
-            file_handling.delete_file(file_to_delete)
+        if deleted_pago.url_comprobante:
+            services.service_archivo.schedule_drain()
         return deleted_pago # Devuelve el objeto eliminado
     except HTTPException as http_exc:
         raise http_exc
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Any, Optional
-from app import crud, models, schemas
+from app import crud, models, schemas, services
 from app.api import deps
 # Importar utilidad de manejo de archivos
 from typing import TYPE_CHECKING
@@ -54,7 +54,7 @@ async def create_presentacion( # <--- async def
     file_url = None
     if file:
         # Guardar archivo y obtener URL/path
-        file_url = await save_upload_file(upload_file=file, destination_folder="presentaciones") # <--- Usar await
+        file_url = await file_handling.save_upload_file(upload_file=file, destination="presentaciones") # <--- Usar await
         if not file_url: # Manejar caso de error en subida
              raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo guardar la imagen.")
 
@@ -69,6 +69,8 @@ async def create_presentacion( # <--- async def
         url_foto=file_url
     )
     presentacion = crud.crud_presentacion.create_presentacion(db=db, presentacion=presentacion_in)
+    if file_url:
+        services.service_archivo.schedule_processing("presentacion", presentacion.id) # Miniaturas y deduplicación
     return presentacion
 
 
@@ -109,12 +111,9 @@ async def update_presentacion( # <--- async def
 
     if file:
         # Guardar nuevo archivo
-        file_url = await save_upload_file(upload_file=file, destination_folder="presentaciones") # <--- Usar await
+        file_url = await file_handling.save_upload_file(upload_file=file, destination="presentaciones") # <--- Usar await
         if not file_url:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo guardar la nueva imagen.")
-        # Si la subida fue exitosa y había una foto antigua diferente, borrar la antigua
-        if old_file_url and old_file_url != file_url:
-             delete_file(old_file_url) # <--- Borrar archivo antiguo
 
 
     update_data = {
@@ -131,13 +130,62 @@ async def update_presentacion( # <--- async def
     elif 'url_foto' in update_data_filtered and update_data_filtered['url_foto'] is None:
          # Si explícitamente se envió url_foto=None o no se envió archivo nuevo,
          # y queremos borrar la foto existente sin subir una nueva:
-         if old_file_url:
-             delete_file(old_file_url)
          update_data_filtered['url_foto'] = None # Asegurar que se guarda None
 
+    foto_cambiada = update_data_filtered.get('url_foto', old_file_url) != old_file_url
+    if foto_cambiada:
+        # La foto anterior se elimina en segundo plano (outbox en la misma transacción)
+        services.service_archivo.enqueue_deletion(db, old_file_url)
+
     updated_presentacion = crud.crud_presentacion.update_presentacion(
         db=db, db_obj=presentacion, obj_in=update_data_filtered
     )
+    if foto_cambiada:
+        if updated_presentacion.url_foto:
+            services.service_archivo.schedule_processing("presentacion", updated_presentacion.id)
+        services.service_archivo.schedule_drain()
+    return updated_presentacion
+
+
+@router.put("/{presentacion_id}/foto", response_model=schemas.Presentacion)
+async def confirm_foto(
+    *,
+    db: Session = Depends(deps.get_db),
+    presentacion_id: int,
+    upload_in: schemas.UploadConfirm,
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Asocia a la presentación una foto subida con URL firmada (POST /uploads/presign).
+    Verifica tamaño y tipo del archivo antes de guardarlo.
+    """
+    presentacion = crud.crud_presentacion.get_presentacion(db, presentacion_id=presentacion_id)
+    if not presentacion:
+        raise HTTPException(status_code=404, detail="Presentación no encontrada")
+
+    try:
+        file_url = await file_handling.confirm_uploaded_file(
+            upload_in.key, destination="presentaciones", token=upload_in.token, user_id=current_user.id
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Una subida se confirma una sola vez: dos filas con la misma key romperían la limpieza de archivos
+    if db.query(models.PresentacionProducto.id).filter(
+        models.PresentacionProducto.url_foto == file_url, models.PresentacionProducto.id != presentacion_id
+    ).first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El archivo ya está asociado a otro registro.")
+
+    old_file_url = presentacion.url_foto
+    if old_file_url != file_url:
+        services.service_archivo.enqueue_deletion(db, old_file_url)
+    updated_presentacion = crud.crud_presentacion.update_presentacion(
+        db=db, db_obj=presentacion, obj_in={"url_foto": file_url}
+    )
+    if old_file_url != file_url:
+        services.service_archivo.schedule_processing("presentacion", updated_presentacion.id)
+        services.service_archivo.schedule_drain()
     return updated_presentacion
 
 
@@ -154,12 +202,13 @@ def delete_presentacion(
         raise HTTPException(status_code=404, detail="Presentación no encontrada")
 
     file_to_delete = presentacion.url_foto # Obtener URL antes de eliminar
+    # La foto se elimina en segundo plano; la outbox se confirma junto con el borrado
+    services.service_archivo.enqueue_deletion(db, file_to_delete)
 
     # Eliminar registro de la BD (ON DELETE CASCADE debería manejar dependencias)
     deleted_presentacion = crud.crud_presentacion.delete_presentacion(db=db, presentacion_id=presentacion_id)
 
-    # Si la eliminación de BD fue exitosa, intentar eliminar el archivo
     if deleted_presentacion and file_to_delete:
-        delete_file(file_to_delete) # <--- Borrar archivo asociado
+        services.service_archivo.schedule_drain()
 
     return deleted_presentacion
\ No newline at end of file
@@ -0,0 +1,84 @@
+# app/api/v1/endpoints/reporte.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Any
+from datetime import date
+from app import schemas, services
+from app.api import deps
+from app.core.config import settings
+from app.utils.cache import TTLCache
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.models import Users
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_reportes_cache = TTLCache(ttl_seconds=settings.CACHE_TTL_SECONDS)
+
+
+@router.get("/ventas", response_model=List[schemas.ReporteVentasPunto])
+def read_reporte_ventas(
+    db: Session = Depends(deps.get_db),
+    periodo: str = Query(default="dia", pattern="^(dia|semana|mes)$"),
+    agrupar: str = Query(default="almacen", pattern="^(almacen|vendedor|producto|tipo)$"),
+    desde: date | None = Query(default=None, description="Fecha inicial (incluida)"),
+    hasta: date | None = Query(default=None, description="Fecha final (incluida)"),
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Serie de ventas (unidades, kg y monto) por día, semana o mes, agrupada por almacén,
+    vendedor, producto o tipo de presentación. Se calcula sobre el resumen ventas_diarias
+    y se cachea unos segundos por combinación de filtros.
+    """
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    clave = ("ventas", periodo, agrupar, desde, hasta, almacen_id)
+
+    def calcular():
+        filas = services.service_reporte.get_ventas_series(
+            db, periodo=periodo, agrupar=agrupar, desde=desde, hasta=hasta, almacen_id=almacen_id
+        )
+        return [schemas.ReporteVentasPunto.model_validate(fila) for fila in filas]
+
+    return _reportes_cache.get_or_set(clave, calcular)
+
+
+@router.get("/cartera", response_model=List[schemas.ReporteCarteraFila])
+def read_reporte_cartera(
+    db: Session = Depends(deps.get_db),
+    fecha_corte: date | None = Query(default=None, description="Fecha de referencia para la antigüedad (hoy por defecto)"),
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    cliente_id: int | None = Query(default=None, description="Filtrar por ID de cliente"),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Cartera por cobrar: saldo pendiente por cliente y almacén, repartido en tramos
+    de 0-30, 31-60, 61-90 y más de 90 días desde la fecha de la venta.
+    Se calcula en SQL sobre el índice parcial de ventas no pagadas (sin caché,
+    para que un pago registrado se refleje de inmediato).
+    """
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    return services.service_reporte.get_cartera(
+        db, fecha_corte=fecha_corte, almacen_id=almacen_id, cliente_id=cliente_id
+    )
+
+
+@router.get("/demanda", response_model=List[schemas.PronosticoDemanda])
+def read_pronostico_demanda(
+    db: Session = Depends(deps.get_db),
+    almacen_id: int | None = Query(default=None, description="Filtrar por ID de almacén"),
+    presentacion_id: int | None = Query(default=None, description="Filtrar por ID de presentación"),
+    limit: int = Query(default=500, le=5000),
+    current_user: "Users" = Depends(deps.require_rol('admin', 'gerente')),
+) -> Any:
+    """
+    Demanda esperada a 4 semanas por presentación y almacén, para planificar producción y
+    compras de lotes. Lee la tabla que actualiza 'python manage.py pronosticar-demanda'.
+    """
+    almacen_id = deps.scope_almacen(almacen_id, current_user)
+    return services.service_pronostico.get_pronosticos_demanda(
+        db, almacen_id=almacen_id, presentacion_id=presentacion_id, limit=limit
+    )
@@ -0,0 +1,82 @@
+# app/api/v1/endpoints/upload.py
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from typing import Any
+from tempfile import SpooledTemporaryFile
+from app import schemas
+from app.api import deps
+from app.core.config import settings
+from app.utils import file_handling
+from app.utils.storage import get_storage, run_blocking, build_key, verify_local_upload, issue_upload_token
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.models import Users
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/presign", response_model=schemas.UploadPresign)
+async def presign_upload(
+    *,
+    upload_in: schemas.UploadPresignRequest,
+    current_user: "Users" = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Genera una URL firmada para subir un comprobante o una foto directamente al almacenamiento.
+    Después de subir, confirmar la key y el token en PUT /pagos/{id}/comprobante o
+    PUT /presentaciones/{id}/foto (el mismo usuario y antes de que expire el token).
+    """
+    if upload_in.content_type not in settings.ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tipo de archivo no permitido: {upload_in.content_type}")
+    if not file_handling.allowed_file(upload_in.filename):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Extensión no permitida: {upload_in.filename}")
+
+    key = build_key(upload_in.destino, upload_in.filename)
+    presigned = await run_blocking(
+        get_storage().presign_upload, key, upload_in.content_type,
+        settings.UPLOAD_MAX_SIZE_BYTES, settings.PRESIGN_EXPIRE_SECONDS
+    )
+    logger.info(f"URL de subida firmada generada para {key} (Usuario ID {current_user.id})")
+    return schemas.UploadPresign(
+        key=key,
+        url=presigned.url,
+        method=presigned.method,
+        fields=presigned.fields,
+        headers=presigned.headers,
+        max_size=settings.UPLOAD_MAX_SIZE_BYTES,
+        expires_in=settings.PRESIGN_EXPIRE_SECONDS,
+        token=issue_upload_token(key, current_user.id, upload_in.destino),
+    )
+
+@router.put("/local/{key:path}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_local(
+    key: str,
+    request: Request,
+    content_type: str = Query(...),
+    max_size: int = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...),
+) -> None:
+    """
+    Destino de las URLs firmadas en desarrollo (STORAGE_MODE=local).
+    Reemplaza a S3/GCS: la firma HMAC autoriza la subida, no el token JWT.
+    """
+    if settings.STORAGE_MODE != "local":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No disponible.")
+    if not verify_local_upload(key, content_type, max_size, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Firma inválida o expirada.")
+    if request.headers.get("content-type", "").split(";")[0].strip() != content_type:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content-Type no coincide con la firma.")
+
+    # Leer el cuerpo por bloques, cortando en cuanto supere el máximo firmado
+    size = 0
+    with SpooledTemporaryFile(max_size=settings.STORAGE_CHUNK_SIZE) as tmp:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Archivo demasiado grande.")
+            tmp.write(chunk)
+        tmp.seek(0)
+        await run_blocking(get_storage().upload_fileobj, tmp, key, content_type)
+    logger.info(f"Archivo subido localmente con URL firmada: {key} ({size} bytes)")
@@ -4,7 +4,7 @@ from fastapi import APIRouter
 # Importa los routers de tus endpoints
 from app.api.v1.endpoints import (
     almacen, auth, cliente, gasto, inventario, lote, merma,
-    movimiento, pago, pedido, presentacion, producto, proveedor, user, venta
+    movimiento, pago, pedido, presentacion, producto, proveedor, user, venta, upload, reporte
 ) # Asegúrate que todos estén aquí
 
 api_router = APIRouter()
@@ -24,4 +24,6 @@ api_router.include_router(venta.router, prefix="/ventas", tags=["Ventas"])
 api_router.include_router(pago.router, prefix="/pagos", tags=["Pagos"])
 api_router.include_router(movimiento.router, prefix="/movimientos", tags=["Movimientos"])
 api_router.include_router(gasto.router, prefix="/gastos", tags=["Gastos"])
-api_router.include_router(pedido.router, prefix="/pedidos", tags=["Pedidos"])
\ No newline at end of file
+api_router.include_router(pedido.router, prefix="/pedidos", tags=["Pedidos"])
+api_router.include_router(upload.router, prefix="/uploads", tags=["Archivos"])
+api_router.include_router(reporte.router, prefix="/reportes", tags=["Reportes"])
\ No newline at end of file
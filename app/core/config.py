@@ -24,11 +24,35 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: Union[str, List[str]] = os.getenv("ALLOWED_ORIGINS", "*")
 
     # Configuración de archivos (para S3 en producción/Lambda)
-    STORAGE_MODE: str = os.getenv("STORAGE_MODE", "local") # 'local' o 's3'
+    STORAGE_MODE: str = os.getenv("STORAGE_MODE", "local") # 'local', 's3' o 'gcs'
     S3_BUCKET_NAME: str | None = os.getenv("S3_BUCKET_NAME")
+    S3_PUBLIC_URL: str | None = os.getenv("S3_PUBLIC_URL") # Opcional: dominio CloudFront o similar
     AWS_ACCESS_KEY_ID: str | None = os.getenv("AWS_ACCESS_KEY_ID") # Mejor usar roles IAM en AWS
     AWS_SECRET_ACCESS_KEY: str | None = os.getenv("AWS_SECRET_ACCESS_KEY") # Mejor usar roles IAM
     AWS_REGION: str | None = os.getenv("AWS_REGION", "us-east-1")
+    GCS_BUCKET_NAME: str | None = os.getenv("GCS_BUCKET_NAME")
+    LOCAL_STORAGE_DIR: str = os.getenv("LOCAL_STORAGE_DIR", "uploads") # Carpeta para STORAGE_MODE=local
+    LOCAL_STORAGE_URL: str = os.getenv("LOCAL_STORAGE_URL", "/uploads") # Prefijo público de los archivos locales
+    STORAGE_MAX_WORKERS: int = int(os.getenv("STORAGE_MAX_WORKERS", "4")) # Hilos para llamadas bloqueantes del SDK
+    STORAGE_CHUNK_SIZE: int = 1024 * 1024 # 1MB por bloque al subir (múltiplo de 256KB para GCS)
+    ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "webp", "pdf"]
+    ALLOWED_CONTENT_TYPES: List[str] = ["image/jpeg", "image/png", "image/webp", "application/pdf"]
+    UPLOAD_MAX_SIZE_BYTES: int = int(os.getenv("UPLOAD_MAX_SIZE_BYTES", str(10 * 1024 * 1024))) # 10MB
+    PRESIGN_EXPIRE_SECONDS: int = 60 * 15 # Validez de las URLs de subida directa
+    UPLOAD_TOKEN_EXPIRE_SECONDS: int = 60 * 60 # Plazo para confirmar una subida directa (token de /uploads/presign)
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "2")) # Hilos para procesar imágenes en segundo plano
+    IMAGE_THUMB_SIZE: int = 256 # Lado máximo (px) de la miniatura
+    IMAGE_WEB_SIZE: int = 1280 # Lado máximo (px) de la versión web
+    OUTBOX_BATCH_SIZE: int = 50 # Eliminaciones de archivos procesadas por lote
+    OUTBOX_MAX_INTENTOS: int = 8 # Luego queda en la tabla para revisión manual
+    OUTBOX_BACKOFF_SECONDS: int = 30 # Espera base entre reintentos (se duplica en cada intento)
+    SWEEPER_GRACE_HOURS: int = 24 # Antigüedad mínima de un archivo huérfano antes de barrerlo
+
+    PARTICIONES_MESES_ADELANTE: int = 3 # Particiones mensuales de movimientos creadas por adelantado
+    ARCHIVO_MESES_RETENCION: int = int(os.getenv("ARCHIVO_MESES_RETENCION", "24")) # Ventas pagadas más antiguas se archivan
+
+    # Caché de consultas agregadas (valuación, reportes). 0 la desactiva
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "60"))
 
     class Config:
         case_sensitive = True
@@ -2,6 +2,7 @@
 from sqlalchemy.orm import Session
 from app import models, schemas # Nota: app/models y app/schemas
 from fastapi.encoders import jsonable_encoder # Útil para convertir Pydantic a dict
+from datetime import date
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -14,6 +15,13 @@ def get_cliente(db: Session, cliente_id: int):
 def get_clientes(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Cliente).offset(skip).limit(limit).all()
 
+def get_clientes_por_visitar(db: Session, hasta: date, almacen_id: int | None = None, limit: int = 100):
+    """Clientes cuya próxima compra esperada es hasta la fecha dada, los más atrasados primero."""
+    query = db.query(models.Cliente).filter(models.Cliente.proxima_compra <= hasta)
+    if almacen_id:
+        query = query.filter(models.Cliente.almacen_id == almacen_id)
+    return query.order_by(models.Cliente.proxima_compra, models.Cliente.id).limit(limit).all()
+
 def create_cliente(db: Session, cliente: schemas.ClienteCreate):
     db_cliente = models.Cliente(**cliente.model_dump()) # Pydantic v2
     # db_cliente = models.Cliente(**cliente.dict()) # Pydantic v1
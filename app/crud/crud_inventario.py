@@ -1,7 +1,9 @@
 # app/crud/crud_inventario.py
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from app import models, schemas
 import logging # Añadir logging
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -27,11 +29,88 @@ def get_inventarios(db: Session, skip: int = 0, limit: int = 100, almacen_id: in
     # Añadir más filtros si es necesario (por presentación, lote, etc.)
     return query.offset(skip).limit(limit).all()
 
+def get_alertas(db: Session, almacen_id: int | None = None, desde: datetime | None = None):
+    """Registros con stock por debajo del mínimo (usa el índice parcial idx_inventario_stock_bajo)."""
+    query = db.query(models.Inventario).filter(models.Inventario.cantidad < models.Inventario.stock_minimo)
+    if almacen_id:
+        query = query.filter(models.Inventario.almacen_id == almacen_id)
+    if desde:
+        query = query.filter(models.Inventario.alerta_desde >= desde)
+    return query.order_by(models.Inventario.alerta_desde.desc()).all()
+
+def sync_alerta_stock(db_obj: "Inventario") -> bool:
+    """
+    Recalcula el estado de alerta de un registro tras un cambio de stock.
+    Solo modifica `alerta_desde` cuando se cruza el umbral; devuelve True en ese caso.
+    """
+    en_alerta = db_obj.cantidad < db_obj.stock_minimo
+    if en_alerta == (db_obj.alerta_desde is not None):
+        return False
+    db_obj.alerta_desde = datetime.now(timezone.utc) if en_alerta else None
+    if en_alerta:
+        logger.info(f"Stock bajo: Inventario ID {db_obj.id} (Pres={db_obj.presentacion_id}, Alm={db_obj.almacen_id}, "
+                    f"Cant={db_obj.cantidad}, Min={db_obj.stock_minimo})")
+    return True
+
+def get_cantidades_matriz(db: Session, producto_id: int | None = None, tipo: str | None = None):
+    """Tuplas (presentacion_id, almacen_id, cantidad) de presentaciones activas, en una sola consulta."""
+    Pres = models.PresentacionProducto
+    query = db.query(
+        models.Inventario.presentacion_id, models.Inventario.almacen_id, models.Inventario.cantidad
+    ).join(Pres, models.Inventario.presentacion_id == Pres.id).filter(Pres.activo.is_(True))
+    if producto_id:
+        query = query.filter(Pres.producto_id == producto_id)
+    if tipo:
+        query = query.filter(Pres.tipo == tipo)
+    return query.all()
+
+def get_snapshots(db: Session, fecha, almacen_id: int | None = None):
+    query = db.query(models.InventarioSnapshot).filter(models.InventarioSnapshot.fecha == fecha)
+    if almacen_id:
+        query = query.filter(models.InventarioSnapshot.almacen_id == almacen_id)
+    return query.order_by(models.InventarioSnapshot.almacen_id, models.InventarioSnapshot.presentacion_id).all()
+
+def get_primer_snapshot(db: Session, presentacion_id: int, almacen_id: int):
+    """Foto más antigua de una presentación en un almacén (saldo de apertura del kardex)."""
+    Snap = models.InventarioSnapshot
+    return db.query(Snap).filter(
+        Snap.presentacion_id == presentacion_id, Snap.almacen_id == almacen_id
+    ).order_by(Snap.tomado_en).first()
+
+def get_valuacion(db: Session, almacen_id: int | None = None):
+    """
+    Valuación del stock agrupada por almacén, producto y tipo de presentación,
+    calculada en una sola consulta GROUP BY (sin cargar los registros).
+    """
+    Inv = models.Inventario
+    Pres = models.PresentacionProducto
+    kg = Inv.cantidad * Pres.capacidad_kg
+    query = db.query(
+        Inv.almacen_id,
+        models.Almacen.nombre.label("almacen_nombre"),
+        models.Producto.id.label("producto_id"),
+        models.Producto.nombre.label("producto_nombre"),
+        Pres.tipo,
+        func.sum(Inv.cantidad).label("unidades"),
+        func.sum(kg).label("kg"),
+        func.sum(Inv.cantidad * Pres.precio_venta).label("valor_venta"),
+        func.round(func.sum(kg * models.Producto.precio_compra) / 1000, 2).label("costo_estimado"),
+    ).join(Pres, Inv.presentacion_id == Pres.id
+    ).join(models.Producto, Pres.producto_id == models.Producto.id
+    ).join(models.Almacen, Inv.almacen_id == models.Almacen.id
+    ).filter(Inv.cantidad > 0)
+    if almacen_id:
+        query = query.filter(Inv.almacen_id == almacen_id)
+    return query.group_by(
+        Inv.almacen_id, models.Almacen.nombre, models.Producto.id, models.Producto.nombre, Pres.tipo
+    ).order_by(Inv.almacen_id, models.Producto.nombre, Pres.tipo).all()
+
 def create_inventario_simple(db: Session, inventario: schemas.InventarioCreate):
     """Crea un registro de inventario sin lógica de movimientos."""
     # Nota: Podría ser útil que el servicio llame a esta función
     # y luego cree un movimiento de entrada inicial.
     db_inventario = models.Inventario(**inventario.model_dump())
+    sync_alerta_stock(db_inventario)
     db.add(db_inventario)
     # Commit aquí o manejarlo en el servicio? Por consistencia con otros CRUD simples, lo dejamos.
     try:
@@ -52,6 +131,7 @@ def update_inventario_simple(db: Session, db_obj: "Inventario", obj_in: schemas.
 
     for field, value in update_data.items():
         setattr(db_obj, field, value)
+    sync_alerta_stock(db_obj) # Puede cambiar cantidad o stock_minimo
 
     db.add(db_obj) # Añadir a la sesión para marcar como 'dirty'
     # No hacer commit aquí, lo manejará el servicio que lo llame
@@ -1,5 +1,6 @@
 # app/crud/crud_lote.py
 from sqlalchemy.orm import Session
+from sqlalchemy import table, column, select, func
 from app import models, schemas
 from decimal import Decimal
 from typing import TYPE_CHECKING
@@ -7,6 +8,15 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from app.models.models import Lote
 
+# Vista materializada (ver migración 4a9e2d6c8b17); se refresca desde service_lote
+lote_rendimiento = table(
+    "lote_rendimiento",
+    column("lote_id"), column("producto_id"), column("proveedor_id"), column("fecha_ingreso"),
+    column("peso_humedo_kg"), column("peso_seco_kg"), column("cantidad_disponible_kg"),
+    column("merma_kg"), column("briquetas_kg"), column("num_mermas"), column("vendido_kg"),
+    column("rendimiento_secado"), column("rendimiento_neto"),
+)
+
 def get_lote(db: Session, lote_id: int):
     return db.query(models.Lote).filter(models.Lote.id == lote_id).first()
 
@@ -61,4 +71,34 @@ def update_cantidad_disponible_lote(db: Session, lote_id: int, cantidad_a_restar
     lote.cantidad_disponible_kg -= cantidad_a_restar
     db.add(lote)
     # No hacer commit aquí, se hará en la transacción del servicio
-    return lote
\ No newline at end of file
+    return lote
+
+def get_rendimiento_lotes(db: Session, skip: int = 0, limit: int = 100, producto_id: int | None = None, proveedor_id: int | None = None):
+    r = lote_rendimiento.c
+    stmt = select(lote_rendimiento)
+    if producto_id is not None:
+        stmt = stmt.where(r.producto_id == producto_id)
+    if proveedor_id is not None:
+        stmt = stmt.where(r.proveedor_id == proveedor_id)
+    return db.execute(stmt.order_by(r.fecha_ingreso.desc()).offset(skip).limit(limit)).all()
+
+def get_rendimiento_proveedores(db: Session, producto_id: int | None = None):
+    """Rendimiento agregado por proveedor (y producto) a partir de la vista."""
+    r = lote_rendimiento.c
+    stmt = select(
+        r.proveedor_id,
+        models.Proveedor.nombre.label("proveedor_nombre"),
+        r.producto_id,
+        func.count().label("num_lotes"),
+        func.sum(r.peso_humedo_kg).label("peso_humedo_kg"),
+        func.sum(r.peso_seco_kg).label("peso_seco_kg"),
+        func.sum(r.merma_kg).label("merma_kg"),
+        func.sum(r.briquetas_kg).label("briquetas_kg"),
+        func.sum(r.vendido_kg).label("vendido_kg"),
+        func.round(func.sum(r.peso_seco_kg) / func.nullif(func.sum(r.peso_humedo_kg), 0), 4).label("rendimiento_secado"),
+        func.round(func.sum(r.merma_kg) / func.nullif(func.sum(func.coalesce(r.peso_seco_kg, r.peso_humedo_kg)), 0), 4).label("tasa_merma"),
+    ).outerjoin(models.Proveedor, models.Proveedor.id == r.proveedor_id)
+    if producto_id is not None:
+        stmt = stmt.where(r.producto_id == producto_id)
+    stmt = stmt.group_by(r.proveedor_id, models.Proveedor.nombre, r.producto_id).order_by(r.proveedor_id, r.producto_id)
+    return db.execute(stmt).all()
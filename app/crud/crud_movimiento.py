@@ -1,5 +1,8 @@
 # app/crud/crud_movimiento.py
 from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, literal
+from decimal import Decimal
+from datetime import datetime
 from app import models, schemas
 
 def get_movimiento(db: Session, movimiento_id: int):
@@ -13,6 +16,13 @@ def get_movimientos(db: Session, skip: int = 0, limit: int = 100, **filters):
         query = query.filter(models.Movimiento.lote_id == filters["lote_id"])
     if filters.get("tipo"):
         query = query.filter(models.Movimiento.tipo == filters["tipo"])
+    if filters.get("almacen_id"):
+        query = query.filter(models.Movimiento.almacen_id == filters["almacen_id"])
+    # Filtrar por fecha permite a PostgreSQL descartar particiones
+    if filters.get("fecha_desde"):
+        query = query.filter(models.Movimiento.fecha >= filters["fecha_desde"])
+    if filters.get("fecha_hasta"):
+        query = query.filter(models.Movimiento.fecha < filters["fecha_hasta"])
     # Añadir más filtros...
     return query.order_by(models.Movimiento.fecha.desc()).offset(skip).limit(limit).all()
 
@@ -25,4 +35,27 @@ def create_movimiento(db: Session, movimiento: schemas.MovimientoCreate, usuario
     # No hacemos commit aquí si se llama desde otra función (ej: create_venta)
     # db.commit()
     # db.refresh(db_movimiento)
-    return db_movimiento # Devolver el objeto sin commit
\ No newline at end of file
+    return db_movimiento # Devolver el objeto sin commit
+
+def kardex_statement(
+    presentacion_id: int,
+    almacen_id: int,
+    saldo_inicial: Decimal = Decimal(0),
+    fecha_desde: datetime | None = None,
+    fecha_hasta: datetime | None = None,
+):
+    """
+    SELECT del kardex: cada movimiento con su saldo acumulado calculado en SQL
+    (SUM() OVER), partiendo de `saldo_inicial` en `fecha_desde`.
+    """
+    Mov = models.Movimiento
+    signo = case((Mov.tipo == 'entrada', Mov.cantidad), else_=-Mov.cantidad)
+    stmt = select(
+        Mov.id, Mov.fecha, Mov.tipo, Mov.cantidad, Mov.lote_id, Mov.usuario_id, Mov.motivo,
+        (literal(saldo_inicial) + func.sum(signo).over(order_by=(Mov.fecha, Mov.id))).label("saldo"),
+    ).where(Mov.presentacion_id == presentacion_id, Mov.almacen_id == almacen_id)
+    if fecha_desde:
+        stmt = stmt.where(Mov.fecha >= fecha_desde)
+    if fecha_hasta:
+        stmt = stmt.where(Mov.fecha < fecha_hasta)
+    return stmt.order_by(Mov.fecha, Mov.id)
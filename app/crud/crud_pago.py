@@ -38,6 +38,10 @@ def update_pago_simple(db: Session, db_obj: "Pago", obj_in: schemas.PagoUpdate |
 
     # Evitar actualizar campos críticos
     allowed_updates = ['referencia', 'url_comprobante']
+    if update_data.get('url_comprobante', db_obj.url_comprobante) != db_obj.url_comprobante:
+        # Las variantes del comprobante anterior dejan de ser válidas (se regeneran en segundo plano)
+        db_obj.url_comprobante_thumb = None
+        db_obj.url_comprobante_web = None
     for field, value in update_data.items():
         if field in allowed_updates:
             setattr(db_obj, field, value)
@@ -29,6 +29,10 @@ def update_presentacion(db: Session, db_obj: "PresentacionProducto", obj_in: sch
         update_data = obj_in
     else:
         update_data = obj_in.model_dump(exclude_unset=True)
+    if update_data.get('url_foto', db_obj.url_foto) != db_obj.url_foto:
+        # Las variantes de la foto anterior dejan de ser válidas (se regeneran en segundo plano)
+        db_obj.url_foto_thumb = None
+        db_obj.url_foto_web = None
     for field, value in update_data.items():
         setattr(db_obj, field, value)
     db.add(db_obj)
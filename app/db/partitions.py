@@ -0,0 +1,74 @@
+# app/db/partitions.py
+"""
+Particiones mensuales (RANGE por fecha) de tablas grandes en PostgreSQL.
+Las particiones futuras se crean por adelantado con `manage.py crear-particiones`
+(programar al menos una vez al mes); lo que caiga fuera va a la partición DEFAULT.
+Si el job se saltó un mes, al crear esa partición se mueven a ella las filas que
+quedaron en DEFAULT (PostgreSQL no permite crearla mientras DEFAULT las contenga).
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("movimientos",)
+
+
+def add_months(dia: date, meses: int) -> date:
+    total = dia.year * 12 + dia.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(tabla: str, inicio: date) -> str:
+    return f"{tabla}_{inicio:%Y_%m}"
+
+
+def _create_partition(db: Session, tabla: str, nombre: str, inicio: date, fin: date) -> None:
+    """Crea la partición [inicio, fin); si DEFAULT ya tiene filas de ese rango, las traslada."""
+    # Límites en UTC explícito: la columna es timestamptz
+    desde, hasta = f"{inicio} 00:00:00+00", f"{fin} 00:00:00+00"
+    default = f"{tabla}_default"
+    rango = {"desde": desde, "hasta": hasta}
+    pendientes = db.execute(text(
+        f"SELECT count(*) FROM {default} WHERE fecha >= :desde AND fecha < :hasta"
+    ), rango).scalar()
+    if not pendientes:
+        db.execute(text(f"CREATE TABLE {nombre} PARTITION OF {tabla} FOR VALUES FROM ('{desde}') TO ('{hasta}')"))
+        return
+    # Todo en la transacción en curso: si algo falla, DEFAULT queda adjunta y con sus filas
+    logger.warning(f"{default} tiene {pendientes} filas de {inicio:%Y-%m}: se trasladan a {nombre}")
+    db.execute(text(f"ALTER TABLE {tabla} DETACH PARTITION {default}"))
+    db.execute(text(f"CREATE TABLE {nombre} PARTITION OF {tabla} FOR VALUES FROM ('{desde}') TO ('{hasta}')"))
+    columnas = ", ".join(
+        db.execute(text(
+            "SELECT quote_ident(attname) FROM pg_attribute "
+            "WHERE attrelid = to_regclass(:tabla) AND attnum > 0 AND NOT attisdropped ORDER BY attnum"
+        ), {"tabla": tabla}).scalars()
+    )
+    db.execute(text(
+        f"WITH movidas AS (DELETE FROM {default} WHERE fecha >= :desde AND fecha < :hasta RETURNING {columnas}) "
+        f"INSERT INTO {nombre} ({columnas}) SELECT {columnas} FROM movidas"
+    ), rango)
+    db.execute(text(f"ALTER TABLE {tabla} ATTACH PARTITION {default} DEFAULT"))
+
+
+def ensure_monthly_partitions(db: Session, tabla: str = "movimientos", meses_adelante: int = 3, desde: date | None = None) -> list[str]:
+    """Crea las particiones mensuales que falten desde `desde` (mes actual por defecto). Devuelve las creadas."""
+    if tabla not in PARTITIONED_TABLES:
+        raise ValueError(f"La tabla '{tabla}' no está particionada.")
+    mes_actual = datetime.now(timezone.utc).date().replace(day=1)
+    inicio = (desde or mes_actual).replace(day=1)
+    creadas = []
+    while inicio <= add_months(mes_actual, meses_adelante):
+        fin = add_months(inicio, 1)
+        nombre = partition_name(tabla, inicio)
+        if db.execute(text("SELECT to_regclass(:nombre)"), {"nombre": nombre}).scalar() is None:
+            _create_partition(db, tabla, nombre, inicio, fin)
+            creadas.append(nombre)
+        inicio = fin
+    db.commit()
+    if creadas:
+        logger.info(f"Particiones creadas en {tabla}: {', '.join(creadas)}")
+    return creadas
@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint, UniqueConstraint, Index
+from sqlalchemy import CheckConstraint, UniqueConstraint, Index, text
 from app.db.base import Base 
 from datetime import datetime, timezone
 from app.utils.extensions import db
@@ -41,6 +41,8 @@ class PresentacionProducto(Base):
     precio_venta = db.Column(db.Numeric(12, 2), nullable=False)  # Precio al público
     activo = db.Column(db.Boolean, default=True)
     url_foto = db.Column(db.String(255))
+    url_foto_thumb = db.Column(db.String(255))  # Variantes generadas en segundo plano
+    url_foto_web = db.Column(db.String(255))
 
     # Relaciones
     producto = db.relationship('Producto', backref=db.backref('presentaciones', lazy=True))
@@ -65,6 +67,11 @@ class Lote(Base):
     producto = db.relationship('Producto', backref=db.backref('lotes', lazy=True))
     proveedor = db.relationship('Proveedor', backref=db.backref('lotes', lazy=True))
 
+    __table_args__ = (
+        # Asignación FIFO: lotes de un producto del más antiguo al más nuevo
+        Index('idx_lote_producto_fecha', 'producto_id', 'fecha_ingreso'),
+    )
+
 class Almacen(Base):
     __tablename__ = 'almacenes'
     id = db.Column(db.Integer, primary_key=True)
@@ -89,6 +96,7 @@ class Inventario(Base):
     cantidad = db.Column(db.Integer, nullable=False, default=0)
     stock_minimo = db.Column(db.Integer, nullable=False, default=10)
     ultima_actualizacion = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    alerta_desde = db.Column(db.DateTime(timezone=True))  # Desde cuándo cantidad < stock_minimo (NULL = sin alerta)
 
     # Relaciones
     presentacion = db.relationship('PresentacionProducto')
@@ -100,6 +108,8 @@ class Inventario(Base):
         
         # Índices para mejorar el rendimiento de consultas comunes
         Index('idx_inventario_almacen', 'almacen_id', 'presentacion_id'),
+        # Índice parcial: solo contiene las filas con stock bajo (alertas)
+        Index('idx_inventario_stock_bajo', 'almacen_id', 'alerta_desde', postgresql_where=text('cantidad < stock_minimo')),
     )
 
 class Venta(Base):
@@ -139,7 +149,9 @@ class Venta(Base):
 
     __table_args__ = (
         CheckConstraint("tipo_pago IN ('contado', 'credito')"),
-        CheckConstraint("estado_pago IN ('pendiente', 'parcial', 'pagado')")
+        CheckConstraint("estado_pago IN ('pendiente', 'parcial', 'pagado')"),
+        # Índice parcial: solo las ventas con saldo (cartera); no crece con el histórico pagado
+        Index('idx_venta_pendiente', 'almacen_id', 'cliente_id', 'fecha', postgresql_where=text("estado_pago <> 'pagado'")),
     )
 
 class VentaDetalle(Base):
@@ -157,6 +169,34 @@ class VentaDetalle(Base):
     def total_linea(self):
         return self.cantidad * self.precio_unitario
 
+class VentaDiaria(Base):
+    """Resumen de ventas por día, almacén, vendedor y presentación (se mantiene al vender/revertir)."""
+    __tablename__ = 'ventas_diarias'
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)  # Día (UTC) de la venta
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='CASCADE'), nullable=False)
+    vendedor_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    presentacion_id = db.Column(db.Integer, db.ForeignKey('presentaciones_producto.id', ondelete='CASCADE'), nullable=False)
+    num_ventas = db.Column(db.Integer, nullable=False, default=0)
+    unidades = db.Column(db.Integer, nullable=False, default=0)
+    kg = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    monto = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('fecha', 'almacen_id', 'vendedor_id', 'presentacion_id', name='uq_venta_diaria'),
+        Index('idx_venta_diaria_almacen_fecha', 'almacen_id', 'fecha'),
+    )
+
+class VentaDetalleLote(Base):
+    """Kg de cada lote consumidos por una línea de venta (asignación FIFO)."""
+    __tablename__ = 'venta_detalle_lotes'
+    id = db.Column(db.Integer, primary_key=True)
+    venta_detalle_id = db.Column(db.Integer, db.ForeignKey('venta_detalles.id', ondelete='CASCADE'), nullable=False, index=True)
+    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id', ondelete='CASCADE'), nullable=False, index=True)
+    cantidad_kg = db.Column(db.Numeric(10, 2), nullable=False)
+
+    lote = db.relationship('Lote')
+
 class Merma(Base):
     __tablename__ = 'mermas'
     id = db.Column(db.Integer, primary_key=True)
@@ -185,6 +225,11 @@ class Cliente(Base):
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     frecuencia_compra_dias = db.Column(db.Integer)  
     ultima_fecha_compra = db.Column(db.DateTime(timezone=True))   
+    # Pronóstico de reposición (lo calcula el proceso por lotes, no la venta)
+    consumo_kg_dia = db.Column(db.Numeric(10, 3))  # Ritmo de consumo observado (kg comprados / días entre compras)
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='SET NULL'))  # Almacén de su última compra
+    proxima_compra = db.Column(db.Date)
+    kg_esperado = db.Column(db.Numeric(10, 2))
 
     ventas = db.relationship('Venta', backref='cliente', lazy=True)
 
@@ -196,6 +241,11 @@ class Cliente(Base):
             if venta.estado_pago != 'pagado'
         )
 
+    __table_args__ = (
+        # Lista de visitas: clientes de un almacén por fecha esperada de compra
+        Index('idx_cliente_proxima_compra', 'almacen_id', 'proxima_compra'),
+    )
+
     def __repr__(self):
         return f'<Cliente {self.nombre}>'
 
@@ -211,16 +261,42 @@ class Pago(Base):
     referencia = db.Column(db.String(50))  # Número de transacción o comprobante
 
     url_comprobante = db.Column(db.String(255))
+    url_comprobante_thumb = db.Column(db.String(255))  # Variantes generadas en segundo plano
+    url_comprobante_web = db.Column(db.String(255))
 
     usuario = db.relationship('Users')
 
     __table_args__ = (
         CheckConstraint("metodo_pago IN ('efectivo', 'transferencia', 'tarjeta')"),
+        Index('idx_pago_venta', 'venta_id'),
     )
 
+class Archivo(Base):
+    """Archivo almacenado, identificado por el hash de su contenido (deduplicación)."""
+    __tablename__ = 'archivos'
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)
+    url = db.Column(db.String(255), nullable=False, index=True)
+    url_thumb = db.Column(db.String(255))
+    url_web = db.Column(db.String(255))
+    tamano_bytes = db.Column(db.Integer)
+    content_type = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class ArchivoEliminacion(Base):
+    """Outbox de archivos a eliminar del almacenamiento; se registra en la misma transacción del cambio."""
+    __tablename__ = 'archivos_eliminacion'
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(255), nullable=False)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    proximo_intento = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+    ultimo_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
 class Movimiento(Base):
+    """Libro de movimientos de stock. Particionado por mes sobre `fecha` (ver app/db/partitions.py)."""
     __tablename__ = 'movimientos'
-    id = db.Column(db.Integer, primary_key=True)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     tipo = db.Column(db.String(10), nullable=False)
     
     # Relación con PresentacionProducto (1)
@@ -234,14 +310,76 @@ class Movimiento(Base):
     # Relación con Usuario (3)
     usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     usuario = db.relationship('Users', back_populates='movimientos')  # Nombre del modelo en singular
+
+    # Almacén afectado (4)
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='SET NULL'))
+    almacen = db.relationship('Almacen')
     
     cantidad = db.Column(db.Numeric(12, 2), nullable=False)
-    fecha = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Forma parte de la PK: PostgreSQL exige incluir la clave de partición
+    fecha = db.Column(db.DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc))
     motivo = db.Column(db.String(255))
 
     __table_args__ = (
         CheckConstraint("tipo IN ('entrada', 'salida')"),
         CheckConstraint("cantidad > 0"),
+        Index('idx_movimiento_almacen_fecha', 'almacen_id', 'presentacion_id', 'fecha'),
+        {'postgresql_partition_by': 'RANGE (fecha)'},
+    )
+
+class InventarioSnapshot(Base):
+    """Foto de inventario.cantidad por presentación y almacén (cierre diario/mensual)."""
+    __tablename__ = 'inventario_snapshots'
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)  # Día al que corresponde la foto
+    tomado_en = db.Column(db.DateTime(timezone=True), nullable=False)  # Instante exacto: los movimientos posteriores no están incluidos
+    presentacion_id = db.Column(db.Integer, db.ForeignKey('presentaciones_producto.id', ondelete='CASCADE'), nullable=False)
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='CASCADE'), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('fecha', 'presentacion_id', 'almacen_id', name='uq_snapshot_fecha_presentacion_almacen'),
+        Index('idx_snapshot_almacen_tomado', 'almacen_id', 'presentacion_id', 'tomado_en'),
+    )
+
+class ConciliacionInventario(Base):
+    """Diferencias encontradas entre inventario.cantidad y el libro de movimientos."""
+    __tablename__ = 'conciliaciones_inventario'
+    id = db.Column(db.Integer, primary_key=True)
+    ejecucion = db.Column(db.String(32), nullable=False, index=True)  # Agrupa las filas de una misma corrida
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='CASCADE'), nullable=False)
+    presentacion_id = db.Column(db.Integer, db.ForeignKey('presentaciones_producto.id', ondelete='CASCADE'), nullable=False)
+    cantidad_inventario = db.Column(db.Integer, nullable=False)
+    cantidad_libro = db.Column(db.Integer, nullable=False)
+    diferencia = db.Column(db.Integer, nullable=False)  # inventario - libro
+    corregido = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class ConciliacionEjecucion(Base):
+    """Almacenes revisados en cada conciliación (también los que cuadraron, que no dejan diferencias)."""
+    __tablename__ = 'conciliaciones_ejecuciones'
+    ejecucion = db.Column(db.String(32), primary_key=True)
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='CASCADE'), primary_key=True)
+    corte = db.Column(db.DateTime(timezone=True), nullable=False)  # transaction_timestamp() de la lectura
+
+    __table_args__ = (
+        Index('idx_conciliacion_ejecucion_almacen', 'almacen_id', 'corte'),
+    )
+
+class PronosticoDemanda(Base):
+    """Demanda esperada por presentación y almacén (suavizado exponencial, ver service_pronostico)."""
+    __tablename__ = 'pronosticos_demanda'
+    id = db.Column(db.Integer, primary_key=True)
+    presentacion_id = db.Column(db.Integer, db.ForeignKey('presentaciones_producto.id', ondelete='CASCADE'), nullable=False)
+    almacen_id = db.Column(db.Integer, db.ForeignKey('almacenes.id', ondelete='CASCADE'), nullable=False)
+    nivel = db.Column(db.Numeric(12, 4), nullable=False)  # Unidades/día suavizadas: estado para la actualización incremental
+    demanda_horizonte = db.Column(db.Numeric(12, 2), nullable=False)  # Unidades esperadas en el horizonte (4 semanas)
+    calculado_hasta = db.Column(db.Date, nullable=False)  # Último día de ventas incluido
+    actualizado_en = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint('presentacion_id', 'almacen_id', name='uq_pronostico_presentacion_almacen'),
+        Index('idx_pronostico_almacen', 'almacen_id', 'presentacion_id'),
     )
 
 class Gasto(Base):
@@ -5,10 +5,12 @@ from .schema_user import User, UserCreate, UserUpdate, UserLogin
 from .schema_proveedor import Proveedor, ProveedorCreate, ProveedorUpdate
 from .schema_producto import Producto, ProductoCreate, ProductoUpdate
 from .schema_presentacion import Presentacion, PresentacionCreate, PresentacionUpdate
-from .schema_lote import Lote, LoteCreate, LoteUpdate
-from .schema_merma import Merma, MermaCreate, MermaUpdate
-from .schema_inventario import Inventario, InventarioCreate, InventarioUpdate
-from .schema_cliente import Cliente, ClienteCreate, ClienteUpdate
+from .schema_lote import Lote, LoteCreate, LoteUpdate, LoteRendimiento, ProveedorRendimiento
+from .schema_merma import Merma, MermaCreate, MermaUpdate, MermaBatchCreate, MermaBatchError, MermaBatchResult
+from .schema_inventario import Inventario, InventarioCreate, InventarioUpdate, InventarioValuacion, InventarioMatriz, \
+    InventarioHistorico, InventarioSnapshot, TransferenciaItem, TransferenciaCreate, Transferencia, \
+    TransferenciaSugerida, ConteoItem, ConteoCreate, ConteoDiferencia, ConteoResultado
+from .schema_cliente import Cliente, ClienteCreate, ClienteUpdate, ClientePorVisitar
 from .schema_movimiento import Movimiento, MovimientoCreate
 from .schema_venta_detalle import VentaDetalle, VentaDetalleCreate, VentaDetalleUpdate
 from .schema_venta import Venta, VentaCreate, VentaUpdate
@@ -16,6 +18,8 @@ from .schema_pago import Pago, PagoCreate, PagoUpdate
 from .schema_gasto import Gasto, GastoCreate, GastoUpdate
 from .schema_pedido_detalle import PedidoDetalle, PedidoDetalleCreate, PedidoDetalleUpdate
 from .schema_pedido import Pedido, PedidoCreate, PedidoUpdate
+from .schema_upload import UploadPresignRequest, UploadPresign, UploadConfirm
+from .schema_reporte import ReporteVentasPunto, ReporteCarteraFila, PronosticoDemanda
 
 # Importar Schemas de Token
 from .schema_token import Token, TokenPayload
@@ -34,3 +34,18 @@ class Cliente(ClienteBase):
     class Config:
         from_attributes = True # Permite cargar datos desde objetos SQLAlchemy (nuevo en Pydantic v2)
         # orm_mode = True # (Para Pydantic v1)
+
+# Fila de la lista de visitas (pronóstico de reposición)
+class ClientePorVisitar(BaseModel):
+    id: int
+    nombre: str
+    telefono: Optional[str] = None
+    direccion: Optional[str] = None
+    almacen_id: Optional[int] = None
+    frecuencia_compra_dias: Optional[int] = None
+    proxima_compra: date
+    dias_atraso: int = 0 # Días desde la fecha esperada de compra (0 si aún no llega)
+    kg_esperado: Optional[Decimal] = None
+
+    class Config:
+        from_attributes = True
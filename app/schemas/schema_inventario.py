@@ -1,7 +1,8 @@
 # app/schemas/schema_inventario.py
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import Optional, List
+from datetime import datetime, date
+from decimal import Decimal
 from .schema_presentacion import Presentacion # Para anidar
 from .schema_almacen import Almacen # Para anidar
 from .schema_lote import Lote # Para anidar info básica
@@ -27,10 +28,103 @@ class InventarioUpdate(BaseModel):
 class Inventario(InventarioBase):
     id: int
     ultima_actualizacion: datetime
+    alerta_desde: Optional[datetime] = None
     # Anidar información completa o parcial
     presentacion: Optional[Presentacion] = None
     almacen: Optional[Almacen] = None
     lote: Optional[Lote] = None # Podría ser solo LoteBase
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class InventarioValuacion(BaseModel):
+    """Stock agregado por almacén, producto y tipo de presentación."""
+    almacen_id: int
+    almacen_nombre: str
+    producto_id: int
+    producto_nombre: str
+    tipo: str
+    unidades: int
+    kg: Decimal
+    valor_venta: Decimal # cantidad * precio_venta
+    costo_estimado: Decimal # kg * precio_compra (por tonelada) / 1000
+
+    class Config:
+        from_attributes = True
+
+
+class InventarioMatriz(BaseModel):
+    """
+    Stock de presentaciones (filas) x almacenes (columnas) en formato compacto.
+    `cantidades` es la matriz densa aplanada por filas: la cantidad de
+    presentacion_ids[i] en almacen_ids[j] está en cantidades[i * len(almacen_ids) + j].
+    """
+    presentacion_ids: List[int]
+    almacen_ids: List[int]
+    cantidades: List[int]
+
+
+class InventarioHistorico(BaseModel):
+    """Stock de una presentación en un almacén en un momento pasado."""
+    presentacion_id: int
+    almacen_id: int
+    cantidad: int
+
+class InventarioSnapshot(InventarioHistorico):
+    id: int
+    fecha: date
+    tomado_en: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TransferenciaItem(BaseModel):
+    presentacion_id: int
+    cantidad: int = Field(..., gt=0)
+
+class TransferenciaCreate(BaseModel):
+    almacen_origen_id: int
+    almacen_destino_id: int
+    items: List[TransferenciaItem] = Field(..., min_length=1, max_length=500)
+    motivo: Optional[str] = Field(None, max_length=150)
+
+class Transferencia(BaseModel):
+    referencia: str # Aparece en el motivo de los movimientos
+    almacen_origen_id: int
+    almacen_destino_id: int
+    items: List[TransferenciaItem]
+
+class TransferenciaSugerida(BaseModel):
+    presentacion_id: int
+    almacen_origen_id: int
+    almacen_destino_id: int
+    cantidad: int
+    stock_origen: int
+    stock_destino: int
+    stock_minimo_destino: int
+    dias_cobertura_destino: Optional[float] = None # Stock / demanda diaria (None si no hay demanda pronosticada)
+
+
+class ConteoItem(BaseModel):
+    presentacion_id: int
+    cantidad: int = Field(..., ge=0) # Cantidad contada físicamente
+
+class ConteoCreate(BaseModel):
+    almacen_id: int
+    items: List[ConteoItem] = Field(..., min_length=1)
+    simular: bool = False # Solo devolver el reporte de diferencias, sin aplicar
+
+class ConteoDiferencia(BaseModel):
+    presentacion_id: int
+    cantidad_sistema: int
+    cantidad_contada: int
+    diferencia: int # contada - sistema
+
+class ConteoResultado(BaseModel):
+    referencia: Optional[str] = None # Motivo de los movimientos de ajuste (None si fue simulación)
+    simulado: bool
+    items_contados: int
+    unidades_sobrantes: int
+    unidades_faltantes: int
+    diferencias: List[ConteoDiferencia] # Solo las presentaciones con diferencia
@@ -33,4 +33,39 @@ class Lote(LoteBase):
     producto: Optional[ProductoBase] = None # Solo info básica
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class LoteRendimiento(BaseModel):
+    """Fila de la vista lote_rendimiento."""
+    lote_id: int
+    producto_id: int
+    proveedor_id: Optional[int] = None
+    fecha_ingreso: Optional[datetime] = None
+    peso_humedo_kg: Decimal
+    peso_seco_kg: Optional[Decimal] = None
+    cantidad_disponible_kg: Optional[Decimal] = None
+    merma_kg: Decimal
+    briquetas_kg: Decimal
+    num_mermas: int
+    vendido_kg: Decimal
+    rendimiento_secado: Optional[Decimal] = None # peso_seco / peso_humedo
+    rendimiento_neto: Optional[Decimal] = None # (peso_seco - mermas) / peso_humedo
+
+    class Config:
+        from_attributes = True
+
+class ProveedorRendimiento(BaseModel):
+    proveedor_id: Optional[int] = None
+    proveedor_nombre: Optional[str] = None
+    producto_id: int
+    num_lotes: int
+    peso_humedo_kg: Decimal
+    peso_seco_kg: Optional[Decimal] = None
+    merma_kg: Decimal
+    briquetas_kg: Decimal
+    vendido_kg: Decimal
+    rendimiento_secado: Optional[Decimal] = None
+    tasa_merma: Optional[Decimal] = None # mermas / peso seco
+
+    class Config:
+        from_attributes = True
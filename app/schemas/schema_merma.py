@@ -1,6 +1,6 @@
 # app/schemas/schema_merma.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
 from .schema_lote import Lote # Para anidar info básica
@@ -29,4 +29,16 @@ class Merma(MermaBase):
     usuario: Optional[UserBase] = None # Solo info básica
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MermaBatchCreate(BaseModel):
+    mermas: List[MermaCreate] = Field(..., min_length=1, max_length=500)
+
+class MermaBatchError(BaseModel):
+    indice: int # Posición en la lista enviada
+    lote_id: int
+    detalle: str
+
+class MermaBatchResult(BaseModel):
+    creadas: List[int] # IDs de las mermas registradas, en el orden enviado
+    errores: List[MermaBatchError]
@@ -13,6 +13,7 @@ class MovimientoBase(BaseModel):
     presentacion_id: int
     lote_id: Optional[int] = None
     usuario_id: Optional[int] = None # Quién registró el movimiento
+    almacen_id: Optional[int] = None # Almacén cuyo stock cambió
     cantidad: Decimal = Field(..., gt=0, decimal_places=2)
     motivo: Optional[str] = Field(None, max_length=255)
     # fecha se establece por defecto
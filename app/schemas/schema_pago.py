@@ -27,6 +27,9 @@ class PagoUpdate(BaseModel):
 class Pago(PagoBase):
     id: int
     fecha: datetime
+    # Variantes del comprobante (se generan en segundo plano tras la subida)
+    url_comprobante_thumb: Optional[str] = None
+    url_comprobante_web: Optional[str] = None
     # Anidar info relevante
     # venta: Optional[Venta] = None # Podría ser mucho, quizás solo IDs
     usuario: Optional[UserBase] = None
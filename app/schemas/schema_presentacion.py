@@ -29,6 +29,9 @@ class PresentacionUpdate(BaseModel):
 # Esquema para leer (incluye info del producto)
 class Presentacion(PresentacionBase):
     id: int
+    # Variantes de la foto (se generan en segundo plano tras la subida)
+    url_foto_thumb: Optional[str] = None
+    url_foto_web: Optional[str] = None
     # Anidar info básica del producto
     producto: Optional[ProductoBase] = None # Anidar info básica
 
@@ -0,0 +1,46 @@
+# app/schemas/schema_reporte.py
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+from decimal import Decimal
+
+class ReporteVentasPunto(BaseModel):
+    """Un punto de la serie: totales de un grupo en un periodo."""
+    periodo: date # Primer día del día/semana/mes
+    grupo_id: Optional[int] = None # ID de almacén/vendedor/producto (None al agrupar por tipo)
+    grupo: str # Nombre del grupo (o el tipo de presentación)
+    unidades: int
+    kg: Decimal
+    monto: Decimal
+
+    class Config:
+        from_attributes = True
+
+class ReporteCarteraFila(BaseModel):
+    """Saldo pendiente de un cliente en un almacén, repartido por antigüedad."""
+    cliente_id: int
+    cliente: str
+    almacen_id: int
+    almacen: str
+    num_ventas: int
+    venta_mas_antigua: date
+    dias_0_30: Decimal
+    dias_31_60: Decimal
+    dias_61_90: Decimal
+    dias_90_mas: Decimal
+    total: Decimal
+
+    class Config:
+        from_attributes = True
+
+class PronosticoDemanda(BaseModel):
+    """Demanda esperada de una presentación en un almacén."""
+    presentacion_id: int
+    almacen_id: int
+    nivel: Decimal # Unidades por día (suavizadas)
+    demanda_horizonte: Decimal # Unidades esperadas en las próximas 4 semanas
+    calculado_hasta: date
+    actualizado_en: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
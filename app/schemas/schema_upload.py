@@ -0,0 +1,22 @@
+# app/schemas/schema_upload.py
+from pydantic import BaseModel, Field
+from typing import Dict
+
+class UploadPresignRequest(BaseModel):
+    destino: str = Field(..., pattern="^(comprobantes|presentaciones)$")
+    filename: str = Field(..., max_length=255)
+    content_type: str = Field(..., max_length=100)
+
+class UploadPresign(BaseModel):
+    key: str
+    url: str
+    method: str # 'PUT' o 'POST' (formulario)
+    fields: Dict[str, str] = {} # Campos a enviar en el formulario si method == 'POST'
+    headers: Dict[str, str] = {} # Cabeceras a enviar si method == 'PUT'
+    max_size: int
+    expires_in: int
+    token: str # Enviar junto con la key al confirmar la subida
+
+class UploadConfirm(BaseModel):
+    key: str = Field(..., max_length=255)
+    token: str = Field(..., max_length=128) # El devuelto por /uploads/presign para esta key
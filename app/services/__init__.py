@@ -4,4 +4,10 @@ from . import service_venta
 from . import service_pago
 from . import service_merma
 from . import service_inventario
-from . import service_pedido
\ No newline at end of file
+from . import service_pedido
+from . import service_archivo
+from . import service_conciliacion
+from . import service_archivado
+from . import service_lote
+from . import service_reporte
+from . import service_pronostico
\ No newline at end of file
@@ -0,0 +1,86 @@
+# app/services/service_archivado.py
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app import models
+from app.core.config import settings
+from datetime import datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tablas de archivo: mismas columnas que la original (CREATE TABLE ... LIKE) + archivado_en.
+# Los movimientos no se archivan: el kardex y el stock a una fecha necesitan el libro completo
+# (su tamaño lo controla el particionado mensual)
+ARCHIVE_TABLES = {
+    "ventas": "ventas_archivo",
+    "venta_detalles": "venta_detalles_archivo",
+    "venta_detalle_lotes": "venta_detalle_lotes_archivo",
+    "pagos": "pagos_archivo",
+}
+
+_SELECT_LOTE = text("""
+    SELECT id, fecha FROM ventas
+    WHERE estado_pago = 'pagado' AND fecha < :corte
+    ORDER BY id
+    LIMIT :lote
+    FOR UPDATE SKIP LOCKED
+""")
+
+# DELETE ... RETURNING dentro de un INSERT: mover filas es una sola sentencia atómica
+_MOVER = {
+    "pagos": "DELETE FROM pagos WHERE venta_id = ANY(:ids)",
+    "venta_detalle_lotes": """
+        DELETE FROM venta_detalle_lotes
+        WHERE venta_detalle_id IN (SELECT id FROM venta_detalles WHERE venta_id = ANY(:ids))
+    """,
+    "venta_detalles": "DELETE FROM venta_detalles WHERE venta_id = ANY(:ids)",
+    "ventas": "DELETE FROM ventas WHERE id = ANY(:ids)",
+}
+
+
+def _mover(db: Session, tabla: str, params: dict) -> int:
+    # Lista de columnas explícita (la del modelo) en ambos lados: no depende del orden físico
+    # de la tabla de archivo, y una columna que falte en el archivo hace fallar el lote
+    columnas = ", ".join(models.Base.metadata.tables[tabla].columns.keys())
+    sql = (
+        f"WITH movidas AS ({_MOVER[tabla]} RETURNING {columnas}) "
+        f"INSERT INTO {ARCHIVE_TABLES[tabla]} ({columnas}) SELECT {columnas} FROM movidas"
+    )
+    return db.execute(text(sql), params).rowcount
+
+
+def archive_closed_sales(
+    db: Session,
+    meses: int | None = None,
+    batch_size: int = 500,
+    max_batches: int | None = None,
+) -> dict:
+    """
+    Mueve a las tablas de archivo las ventas pagadas con más de `meses` de antigüedad,
+    con sus detalles, asignaciones de lotes y pagos. Cada lote es una transacción corta
+    (SKIP LOCKED: no bloquea ni espera a las peticiones en curso). Los reportes no cambian:
+    ventas_diarias ya tiene esas ventas y se regenera también desde las tablas de archivo.
+    """
+    meses = meses or settings.ARCHIVO_MESES_RETENCION
+    corte = datetime.now(timezone.utc) - timedelta(days=30 * meses)
+
+    totales = {tabla: 0 for tabla in ARCHIVE_TABLES}
+    lotes = 0
+    while max_batches is None or lotes < max_batches:
+        filas = db.execute(_SELECT_LOTE, {"corte": corte, "lote": batch_size}).all()
+        if not filas:
+            break
+        ids = [f.id for f in filas]
+        try:
+            for tabla in ("pagos", "venta_detalle_lotes", "venta_detalles", "ventas"):
+                totales[tabla] += _mover(db, tabla, {"ids": ids})
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.error(f"Error archivando lote de ventas {ids[0]}..{ids[-1]}", exc_info=True)
+            raise
+        lotes += 1
+        logger.info(f"Lote {lotes} archivado: ventas {ids[0]}..{ids[-1]}")
+
+    logger.info(f"Archivado completado (corte {corte:%Y-%m-%d}): {totales}")
+    return totales
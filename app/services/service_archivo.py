@@ -0,0 +1,314 @@
+# app/services/service_archivo.py
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select, union, union_all, table, column
+from concurrent.futures import ThreadPoolExecutor
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.storage import get_storage
+from datetime import datetime, timedelta, timezone
+import hashlib
+import io
+import logging
+import mimetypes
+
+logger = logging.getLogger(__name__)
+
+# tipo -> (modelo, campo url original, campo miniatura, campo web)
+_DESTINOS = {
+    "pago": ("Pago", "url_comprobante", "url_comprobante_thumb", "url_comprobante_web"),
+    "presentacion": ("PresentacionProducto", "url_foto", "url_foto_thumb", "url_foto_web"),
+}
+
+# Pool propio para no competir con el de llamadas de almacenamiento de las peticiones
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="imagenes")
+
+
+def schedule_processing(tipo: str, obj_id: int) -> None:
+    """Encola el procesamiento del archivo de un pago/presentación. No bloquea la petición."""
+    _executor.submit(_process_in_new_session, tipo, obj_id)
+
+
+def _process_in_new_session(tipo: str, obj_id: int) -> None:
+    db = SessionLocal()
+    try:
+        process_file(db, tipo, obj_id)
+    except Exception as e:
+        logger.error(f"Error procesando archivo de {tipo} ID {obj_id}: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def _build_variants(data: bytes, prefix: str, digest: str) -> dict:
+    """Genera miniatura y versión web (WEBP) y devuelve sus URLs."""
+    from PIL import Image, ImageOps
+
+    storage = get_storage()
+    urls = {}
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB") # Respetar orientación de la cámara
+        for nombre, lado in (("thumb", settings.IMAGE_THUMB_SIZE), ("web", settings.IMAGE_WEB_SIZE)):
+            variante = img.copy()
+            variante.thumbnail((lado, lado))
+            buffer = io.BytesIO()
+            variante.save(buffer, "WEBP", quality=80)
+            buffer.seek(0)
+            urls[nombre] = storage.upload_fileobj(buffer, f"{prefix}/variantes/{digest}_{nombre}.webp", "image/webp")
+    return urls
+
+
+def process_file(db: Session, tipo: str, obj_id: int, _retry: bool = True) -> None:
+    """
+    Calcula el hash del archivo asociado y lo deduplica: si ya existe un archivo con el
+    mismo contenido se reutiliza (y se borra la copia nueva); si no, se generan las variantes.
+    """
+    nombre_modelo, campo_url, campo_thumb, campo_web = _DESTINOS[tipo]
+    model = getattr(models, nombre_modelo)
+    obj = db.get(model, obj_id)
+    url = getattr(obj, campo_url) if obj else None
+    if not url:
+        return
+
+    storage = get_storage()
+    # FOR UPDATE: drain_deletions bloquea el archivo antes de contar referencias, así que
+    # o ve la nueva referencia al terminar este commit o ya lo borró y aquí no se encuentra
+    archivo = db.query(models.Archivo).filter(models.Archivo.url == url).with_for_update().first()
+    copia_duplicada = None
+    if archivo is None:
+        key = storage.key_from_url(url)
+        if not key:
+            logger.warning(f"URL de {tipo} ID {obj_id} fuera del almacenamiento configurado: {url}")
+            return
+        data = storage.download(key)
+        digest = hashlib.sha256(data).hexdigest()
+        archivo = db.query(models.Archivo).filter(models.Archivo.sha256 == digest).with_for_update().first()
+        if archivo is not None:
+            copia_duplicada = key # Mismo contenido ya almacenado
+        else:
+            content_type = mimetypes.guess_type(key)[0]
+            variantes = {}
+            if content_type and content_type.startswith("image/"):
+                variantes = _build_variants(data, key.split("/", 1)[0], digest)
+            archivo = models.Archivo(
+                sha256=digest, url=url, url_thumb=variantes.get("thumb"), url_web=variantes.get("web"),
+                tamano_bytes=len(data), content_type=content_type,
+            )
+            db.add(archivo)
+
+    # Bloquear y comprobar que la URL no cambió mientras se procesaba
+    obj = db.query(model).filter(model.id == obj_id, getattr(model, campo_url) == url).with_for_update().first()
+    if obj is None:
+        db.rollback()
+        return
+    setattr(obj, campo_url, archivo.url)
+    setattr(obj, campo_thumb, archivo.url_thumb)
+    setattr(obj, campo_web, archivo.url_web)
+    if copia_duplicada:
+        enqueue_deletion(db, url)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otro worker registró el mismo hash a la vez: reintentar reutilizándolo
+        db.rollback()
+        if _retry:
+            return process_file(db, tipo, obj_id, _retry=False)
+        raise
+
+    if copia_duplicada:
+        schedule_drain()
+        logger.info(f"Archivo duplicado de {tipo} ID {obj_id} reemplazado por {archivo.url}")
+    else:
+        logger.info(f"Archivo de {tipo} ID {obj_id} procesado ({archivo.sha256[:12]})")
+
+
+def process_pending(db: Session, limit: int = 100) -> int:
+    """Procesa registros cuyo archivo aún no está registrado (ej: si el worker se interrumpió)."""
+    procesados = 0
+    for tipo, (nombre_modelo, campo_url, _, _) in _DESTINOS.items():
+        model = getattr(models, nombre_modelo)
+        columna_url = getattr(model, campo_url)
+        sin_procesar = ~db.query(models.Archivo.id).filter(models.Archivo.url == columna_url).exists()
+        ids = [row.id for row in db.query(model.id).filter(
+            columna_url.isnot(None), sin_procesar
+        ).limit(limit).all()]
+        for obj_id in ids:
+            try:
+                process_file(db, tipo, obj_id)
+                procesados += 1
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error procesando archivo de {tipo} ID {obj_id}: {e}", exc_info=True)
+    return procesados
+
+
+def _columnas_registros() -> tuple:
+    """Columnas de pagos/presentaciones (vivos y archivados) que apuntan a archivos almacenados."""
+    # Los pagos archivados (service_archivado) conservan sus comprobantes
+    pagos_archivo = table("pagos_archivo", column("url_comprobante"), column("url_comprobante_thumb"), column("url_comprobante_web"))
+    return (
+        models.Pago.url_comprobante, models.Pago.url_comprobante_thumb, models.Pago.url_comprobante_web,
+        models.PresentacionProducto.url_foto, models.PresentacionProducto.url_foto_thumb,
+        models.PresentacionProducto.url_foto_web,
+    ) + tuple(pagos_archivo.c)
+
+
+def count_references(db: Session, urls: list[str]) -> int:
+    """
+    Cuántas referencias de pagos/presentaciones (incluidos los pagos archivados) hay a
+    alguna de `urls` (original y variantes). Los archivos deduplicados se comparten.
+    """
+    consultas = [select(col.label("url")).where(col.in_(urls)) for col in _columnas_registros()]
+    return db.execute(select(func.count()).select_from(union_all(*consultas).subquery())).scalar()
+
+
+def enqueue_deletion(db: Session, url: str | None) -> None:
+    """
+    Registra un archivo para eliminarlo en segundo plano. No hace commit: debe
+    llamarse antes del commit del cambio en BD para que ambos sean atómicos.
+    """
+    if url:
+        db.add(models.ArchivoEliminacion(url=url))
+
+
+def schedule_drain() -> None:
+    """Procesa la outbox en segundo plano, después del commit de la petición."""
+    _executor.submit(_drain_in_new_session)
+
+
+def _drain_in_new_session() -> None:
+    db = SessionLocal()
+    try:
+        drain_deletions(db)
+    except Exception as e:
+        logger.error(f"Error procesando eliminaciones de archivos: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def _delete_url(storage, url: str) -> None:
+    key = storage.key_from_url(url)
+    if not key:
+        logger.warning(f"URL fuera del almacenamiento configurado, se descarta: {url}")
+        return
+    storage.delete(key)
+
+
+def drain_deletions(db: Session, batch_size: int | None = None, max_batches: int = 20) -> tuple[int, int]:
+    """
+    Elimina por lotes los archivos pendientes de la outbox. Los fallos se reintentan
+    con espera exponencial. Devuelve (eliminados, fallidos).
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    storage = get_storage()
+    eliminados = fallidos = 0
+    for _ in range(max_batches):
+        ahora = datetime.now(timezone.utc)
+        # SKIP LOCKED: varios workers pueden vaciar la outbox sin pisarse
+        pendientes = db.query(models.ArchivoEliminacion).filter(
+            models.ArchivoEliminacion.proximo_intento <= ahora,
+            models.ArchivoEliminacion.intentos < settings.OUTBOX_MAX_INTENTOS,
+        ).order_by(models.ArchivoEliminacion.id).limit(batch_size).with_for_update(skip_locked=True).all()
+        if not pendientes:
+            break
+
+        for entrada in pendientes:
+            # Bloquear el archivo antes de contar referencias: process_file lo bloquea al
+            # reutilizarlo, así que nadie puede adoptarlo mientras se decide borrarlo
+            archivo = db.query(models.Archivo).filter(
+                models.Archivo.url == entrada.url
+            ).with_for_update().first()
+            urls = [entrada.url] + ([u for u in (archivo.url_thumb, archivo.url_web) if u] if archivo else [])
+            # Los archivos deduplicados se comparten: no borrar si algo aún los referencia
+            if count_references(db, urls) > 0:
+                db.delete(entrada)
+                continue
+            try:
+                for url in urls:
+                    _delete_url(storage, url)
+            except Exception as e:
+                entrada.intentos += 1
+                espera = settings.OUTBOX_BACKOFF_SECONDS * 2 ** (entrada.intentos - 1)
+                entrada.proximo_intento = ahora + timedelta(seconds=espera)
+                entrada.ultimo_error = str(e)[:500]
+                fallidos += 1
+                logger.warning(f"No se pudo eliminar {entrada.url} (intento {entrada.intentos}): {e}")
+                continue
+            if archivo:
+                db.delete(archivo)
+            db.delete(entrada)
+            eliminados += 1
+        db.commit() # Libera los bloqueos del lote
+
+    if eliminados or fallidos:
+        logger.info(f"Outbox de archivos: {eliminados} eliminados, {fallidos} con error")
+    return eliminados, fallidos
+
+
+# --- Barrido de archivos huérfanos ---
+
+SWEEP_PREFIXES = ("comprobantes", "presentaciones")
+QUARANTINE_PREFIX = "cuarentena"
+
+
+def _referenced_urls(db: Session, urls: list[str]) -> set[str]:
+    """Devuelve cuáles de `urls` están referenciadas, con una sola consulta por lote."""
+    columnas = _columnas_registros() + (
+        models.Archivo.url, models.Archivo.url_thumb, models.Archivo.url_web,
+        models.ArchivoEliminacion.url, # Pendientes de la outbox: los borra el worker
+    )
+    consultas = [select(col.label("url")).where(col.in_(urls)) for col in columnas]
+    return {row.url for row in db.execute(union(*consultas))}
+
+
+def sweep_orphans(
+    db: Session,
+    grace_hours: int | None = None,
+    quarantine: bool = True,
+    dry_run: bool = False,
+    batch_size: int = 500,
+) -> dict:
+    """
+    Recorre el almacenamiento y elimina (o mueve a cuarentena) los archivos que ningún
+    registro referencia y son más antiguos que el periodo de gracia (subidas en curso).
+    """
+    grace_hours = settings.SWEEPER_GRACE_HOURS if grace_hours is None else grace_hours
+    limite = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    storage = get_storage()
+    reporte = {"revisados": 0, "huerfanos": 0, "bytes_recuperados": 0, "errores": 0}
+
+    def procesar_lote(lote: list):
+        por_url = {storage.url_for(obj.key): obj for obj in lote}
+        referenciadas = _referenced_urls(db, list(por_url))
+        for url, obj in por_url.items():
+            if url in referenciadas:
+                continue
+            reporte["huerfanos"] += 1
+            if dry_run:
+                reporte["bytes_recuperados"] += obj.size
+                continue
+            try:
+                if quarantine:
+                    storage.move(obj.key, f"{QUARANTINE_PREFIX}/{obj.key}")
+                else:
+                    storage.delete(obj.key)
+                reporte["bytes_recuperados"] += obj.size
+            except Exception as e:
+                reporte["errores"] += 1
+                logger.warning(f"No se pudo barrer {obj.key}: {e}")
+
+    for prefix in SWEEP_PREFIXES:
+        lote = []
+        for obj in storage.iter_objects(prefix):
+            reporte["revisados"] += 1
+            if obj.updated and obj.updated > limite:
+                continue # Dentro del periodo de gracia (p.ej. subida firmada sin confirmar)
+            lote.append(obj)
+            if len(lote) >= batch_size:
+                procesar_lote(lote)
+                lote = []
+        if lote:
+            procesar_lote(lote)
+
+    logger.info(f"Barrido de huérfanos{' (simulado)' if dry_run else ''}: {reporte}")
+    return reporte
@@ -0,0 +1,120 @@
+# app/services/service_conciliacion.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+from concurrent.futures import ThreadPoolExecutor
+from app import models
+from app.db.session import SessionLocal
+from decimal import Decimal
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+def _conciliar_almacen(almacen_id: int) -> tuple[dict, list[dict]]:
+    """
+    Compara inventario.cantidad con el saldo del libro de un almacén: SUM(±cantidad) de
+    todos sus movimientos (sin fotos, que son copias de inventario y absorberían la deriva).
+    Se ejecuta en un hilo del pool con su propia sesión y una lectura consistente.
+    Devuelve (almacén revisado con su corte, diferencias).
+    """
+    db = SessionLocal()
+    try:
+        # REPEATABLE READ: todas las lecturas ven la misma foto de la BD, tomada en la primera
+        # consulta; el corte se lee en esa misma transacción (sin carrera con ventas en curso)
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        corte = db.execute(func.transaction_timestamp().select()).scalar()
+        Mov = models.Movimiento
+        signo = case((Mov.tipo == 'entrada', Mov.cantidad), else_=-Mov.cantidad)
+        libro = dict(db.query(Mov.presentacion_id, func.sum(signo)).filter(
+            Mov.almacen_id == almacen_id
+        ).group_by(Mov.presentacion_id).all())
+        actual = dict(db.query(models.Inventario.presentacion_id, models.Inventario.cantidad).filter(
+            models.Inventario.almacen_id == almacen_id
+        ).all())
+        diferencias = []
+        for presentacion_id in libro.keys() | actual.keys():
+            cantidad_inventario = actual.get(presentacion_id, 0)
+            cantidad_libro = int(libro.get(presentacion_id) or 0)
+            if cantidad_inventario != cantidad_libro:
+                diferencias.append({
+                    "almacen_id": almacen_id,
+                    "presentacion_id": presentacion_id,
+                    "cantidad_inventario": cantidad_inventario,
+                    "cantidad_libro": cantidad_libro,
+                    "diferencia": cantidad_inventario - cantidad_libro,
+                })
+        return {"almacen_id": almacen_id, "corte": corte}, diferencias
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _diferencias_previas(db: Session, almacen_ids: list[int]) -> set[tuple[int, int, int]]:
+    """
+    (almacén, presentación, diferencia) registradas en la conciliación anterior de cada almacén.
+    Si esa conciliación cuadró, no hay filas: nada se confirma.
+    """
+    Ejec, Conc = models.ConciliacionEjecucion, models.ConciliacionInventario
+    ultimas = db.query(Ejec.almacen_id, Ejec.ejecucion).filter(Ejec.almacen_id.in_(almacen_ids)).distinct(
+        Ejec.almacen_id
+    ).order_by(Ejec.almacen_id, Ejec.corte.desc()).all()
+    previas = set()
+    for almacen_id, ejecucion in ultimas:
+        previas.update(
+            (almacen_id, f.presentacion_id, f.diferencia)
+            for f in db.query(Conc.presentacion_id, Conc.diferencia).filter(
+                Conc.ejecucion == ejecucion, Conc.almacen_id == almacen_id
+            )
+        )
+    return previas
+
+
+def reconcile_inventory(
+    db: Session,
+    almacen_ids: list[int] | None = None,
+    workers: int = 4,
+    corregir: bool = False,
+    usuario_id: int | None = None,
+) -> tuple[str, list["models.ConciliacionInventario"]]:
+    """
+    Concilia el inventario contra el libro de movimientos, un almacén por tarea en
+    paralelo. Guarda las diferencias en conciliaciones_inventario y, si `corregir`,
+    crea movimientos de ajuste para que el libro cuadre con el inventario físico,
+    solo para las diferencias que se repiten (misma cantidad) en dos conciliaciones
+    seguidas del almacén: una diferencia aislada puede ser ruido y se deja para revisión.
+    Devuelve (id de ejecución, diferencias registradas).
+    """
+    if almacen_ids is None:
+        almacen_ids = [row.id for row in db.query(models.Almacen.id).order_by(models.Almacen.id).all()]
+    previas = _diferencias_previas(db, almacen_ids) if corregir else set()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="conciliacion") as pool:
+        resultados = list(pool.map(_conciliar_almacen, almacen_ids))
+
+    ejecucion = uuid.uuid4().hex
+    registros = []
+    for revisado, diferencias in resultados:
+        db.add(models.ConciliacionEjecucion(ejecucion=ejecucion, **revisado))
+        for d in diferencias:
+            confirmada = (d["almacen_id"], d["presentacion_id"], d["diferencia"]) in previas
+            registro = models.ConciliacionInventario(ejecucion=ejecucion, corregido=confirmada, **d)
+            registros.append(registro)
+            if confirmada:
+                # El inventario físico manda: el ajuste lleva el libro a la cantidad de inventario
+                db.add(models.Movimiento(
+                    tipo='entrada' if d["diferencia"] > 0 else 'salida',
+                    presentacion_id=d["presentacion_id"],
+                    almacen_id=d["almacen_id"],
+                    usuario_id=usuario_id,
+                    cantidad=Decimal(abs(d["diferencia"])),
+                    motivo=f"Conciliación {ejecucion[:12]}",
+                ))
+    db.add_all(registros)
+    db.commit()
+    corregidas = sum(1 for r in registros if r.corregido)
+    logger.info(
+        f"Conciliación {ejecucion}: {len(almacen_ids)} almacenes, {len(registros)} diferencias"
+        f"{f', {corregidas} corregidas' if corregir else ''}"
+    )
+    return ejecucion, registros
@@ -1,10 +1,15 @@
 # app/services/service_inventario.py
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, case, select, literal, update, insert, values, column, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import HTTPException, status
 from app import models, schemas, crud
 from decimal import Decimal
+from datetime import date, datetime, time, timedelta, timezone
 import logging
+import uuid
+import numpy as np
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -46,6 +51,7 @@ def update_inventario_with_adjustment(
             mov_create = schemas.MovimientoCreate(
                 tipo=tipo_movimiento,
                 presentacion_id=updated_inventario.presentacion_id,
+                almacen_id=updated_inventario.almacen_id,
                 lote_id=updated_inventario.lote_id, # Usar el lote actual del inventario
                 cantidad=cantidad_movimiento,
                 motivo=motivo
@@ -95,6 +101,7 @@ def delete_inventario_with_adjustment(
             mov_create = schemas.MovimientoCreate(
                 tipo='salida',
                 presentacion_id=db_inventario.presentacion_id,
+                almacen_id=db_inventario.almacen_id,
                 lote_id=db_inventario.lote_id,
                 cantidad=Decimal(cantidad_existente),
                 motivo=f"Eliminación de registro Inventario ID: {db_inventario.id}"
@@ -122,3 +129,424 @@ def delete_inventario_with_adjustment(
         db.rollback()
         logger.error(f"Error inesperado al eliminar inventario ID {inventario_id}: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error inesperado al procesar la eliminación.")
+
+
+def transfer_stock(db: Session, transferencia: schemas.TransferenciaCreate, current_user_id: int | None = None) -> dict:
+    """
+    Mueve stock de varias presentaciones entre dos almacenes en una sola transacción:
+    bloqueo de ambos lados en orden de ID, descuento condicional en origen
+    (falla si alguna no alcanza), ingreso en destino y movimientos pareados en bloque.
+    """
+    origen, destino = transferencia.almacen_origen_id, transferencia.almacen_destino_id
+    if origen == destino:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El almacén de origen y destino deben ser distintos.")
+    for almacen_id in (origen, destino):
+        if not crud.crud_almacen.get_almacen(db, almacen_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Almacén ID {almacen_id} no encontrado.")
+
+    cantidades = {} # Agrupar si una presentación viene repetida
+    for item in transferencia.items:
+        cantidades[item.presentacion_id] = cantidades.get(item.presentacion_id, 0) + item.cantidad
+    presentacion_ids = sorted(cantidades)
+    validas = {pid for (pid,) in db.query(models.PresentacionProducto.id).filter(
+        models.PresentacionProducto.id.in_(presentacion_ids)
+    ).all()}
+    invalidas = [pid for pid in presentacion_ids if pid not in validas]
+    if invalidas:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Presentaciones no encontradas: {invalidas}")
+    Inv = models.Inventario
+    referencia = uuid.uuid4().hex[:12]
+
+    try:
+        # 1. Crear en destino los registros que falten (cantidad 0)
+        db.execute(pg_insert(Inv).values([
+            {"presentacion_id": pid, "almacen_id": destino, "cantidad": 0} for pid in presentacion_ids
+        ]).on_conflict_do_nothing(constraint='uq_inventario_compuesto'))
+
+        # 2. Bloquear ambos lados en orden de ID (mismo orden en toda transferencia: sin interbloqueos)
+        filas = db.query(Inv.id, Inv.almacen_id, Inv.presentacion_id, Inv.lote_id).filter(
+            Inv.almacen_id.in_((origen, destino)), Inv.presentacion_id.in_(presentacion_ids)
+        ).order_by(Inv.id).with_for_update().all()
+        lotes_origen = {f.presentacion_id: f.lote_id for f in filas if f.almacen_id == origen}
+
+        tabla = values(column("presentacion_id", Integer), column("cantidad", Integer), name="t").data(
+            [(pid, cantidades[pid]) for pid in presentacion_ids]
+        )
+        # 3. Descuento condicional: solo donde alcanza el stock
+        descontadas = set(db.execute(
+            update(Inv).where(
+                Inv.almacen_id == origen, Inv.presentacion_id == tabla.c.presentacion_id, Inv.cantidad >= tabla.c.cantidad
+            ).values(cantidad=Inv.cantidad - tabla.c.cantidad).returning(Inv.presentacion_id),
+            execution_options={"synchronize_session": False},
+        ).scalars())
+        faltantes = [pid for pid in presentacion_ids if pid not in descontadas]
+        if faltantes:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Stock insuficiente en el almacén de origen para las presentaciones: {faltantes}",
+            )
+
+        # 4. Ingreso en destino
+        db.execute(
+            update(Inv).where(
+                Inv.almacen_id == destino, Inv.presentacion_id == tabla.c.presentacion_id
+            ).values(cantidad=Inv.cantidad + tabla.c.cantidad),
+            execution_options={"synchronize_session": False},
+        )
+        # 5. Estado de alerta de stock de las filas tocadas, en una sentencia
+        db.execute(
+            update(Inv).where(Inv.id.in_([f.id for f in filas])).values(
+                alerta_desde=case((Inv.cantidad < Inv.stock_minimo, func.coalesce(Inv.alerta_desde, func.now())), else_=None)
+            ),
+            execution_options={"synchronize_session": False},
+        )
+
+        # 6. Movimientos pareados (salida en origen, entrada en destino) en un solo INSERT
+        motivo = f"Transferencia {referencia}: Alm {origen} -> Alm {destino}"
+        if transferencia.motivo:
+            motivo = f"{motivo} - {transferencia.motivo}"
+        ahora = datetime.now(timezone.utc)
+        db.execute(insert(models.Movimiento), [
+            {
+                "tipo": tipo, "presentacion_id": pid, "almacen_id": almacen_id, "lote_id": lotes_origen.get(pid),
+                "usuario_id": current_user_id, "cantidad": Decimal(cantidades[pid]), "fecha": ahora, "motivo": motivo,
+            }
+            for pid in presentacion_ids
+            for tipo, almacen_id in (("salida", origen), ("entrada", destino))
+        ])
+        db.commit()
+        db.expire_all() # Los UPDATE masivos no actualizan los objetos en sesión
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error SQLAlchemy en transferencia {origen} -> {destino}: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al registrar la transferencia.")
+
+    logger.info(f"Transferencia {referencia}: {len(presentacion_ids)} presentaciones de Alm {origen} a Alm {destino}")
+    return {
+        "referencia": referencia,
+        "almacen_origen_id": origen,
+        "almacen_destino_id": destino,
+        "items": [{"presentacion_id": pid, "cantidad": cantidades[pid]} for pid in presentacion_ids],
+    }
+
+
+def apply_stocktake(
+    db: Session,
+    almacen_id: int,
+    conteo: dict[int, int],
+    simular: bool = False,
+    current_user_id: int | None = None,
+) -> dict:
+    """
+    Aplica un conteo físico ({presentacion_id: cantidad}) a un almacén: carga las cantidades
+    actuales en una consulta, calcula las diferencias de forma vectorizada y, si no es
+    simulación, actualiza inventario y crea los movimientos de ajuste en bloque (una transacción).
+    Las presentaciones no incluidas en el conteo no se modifican.
+    """
+    presentacion_ids = np.array(sorted(conteo), dtype=np.int64)
+    contadas = np.array([conteo[pid] for pid in presentacion_ids.tolist()], dtype=np.int64)
+    Inv = models.Inventario
+
+    validas = {pid for (pid,) in db.query(models.PresentacionProducto.id).filter(
+        models.PresentacionProducto.id.in_(presentacion_ids.tolist())
+    ).all()}
+    invalidas = sorted(set(presentacion_ids.tolist()) - validas)
+    if invalidas:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Presentaciones no encontradas: {invalidas}")
+
+    try:
+        query = db.query(Inv.presentacion_id, Inv.cantidad, Inv.lote_id).filter(
+            Inv.almacen_id == almacen_id, Inv.presentacion_id.in_(presentacion_ids.tolist())
+        )
+        if not simular:
+            query = query.order_by(Inv.id).with_for_update()
+        actuales = query.all()
+
+        # Alinear las cantidades del sistema con el conteo (0 si no hay registro)
+        sistema = np.zeros(len(presentacion_ids), dtype=np.int64)
+        lotes = {}
+        if actuales:
+            ids_actuales = np.array([f.presentacion_id for f in actuales], dtype=np.int64)
+            posiciones = np.searchsorted(presentacion_ids, ids_actuales)
+            sistema[posiciones] = [f.cantidad for f in actuales]
+            lotes = {f.presentacion_id: f.lote_id for f in actuales}
+        existentes = np.isin(presentacion_ids, [f.presentacion_id for f in actuales])
+
+        diferencias = contadas - sistema
+        con_diferencia = diferencias != 0
+        resultado = {
+            "referencia": None,
+            "simulado": simular,
+            "items_contados": int(len(presentacion_ids)),
+            "unidades_sobrantes": int(diferencias[diferencias > 0].sum()),
+            "unidades_faltantes": int(-diferencias[diferencias < 0].sum()),
+            "diferencias": [
+                {"presentacion_id": int(pid), "cantidad_sistema": int(s), "cantidad_contada": int(c), "diferencia": int(d)}
+                for pid, s, c, d in zip(
+                    presentacion_ids[con_diferencia], sistema[con_diferencia],
+                    contadas[con_diferencia], diferencias[con_diferencia],
+                )
+            ],
+        }
+        if simular or not con_diferencia.any():
+            db.rollback()
+            return resultado
+
+        referencia = uuid.uuid4().hex[:12]
+        # Registros nuevos (contados pero sin inventario en el almacén)
+        nuevos = presentacion_ids[~existentes & con_diferencia]
+        if len(nuevos):
+            db.execute(pg_insert(Inv).values([
+                {"presentacion_id": int(pid), "almacen_id": almacen_id, "cantidad": 0} for pid in nuevos
+            ]).on_conflict_do_nothing(constraint='uq_inventario_compuesto'))
+
+        tabla = values(column("presentacion_id", Integer), column("cantidad", Integer), name="c").data(
+            list(zip(presentacion_ids[con_diferencia].tolist(), contadas[con_diferencia].tolist()))
+        )
+        db.execute(
+            update(Inv).where(Inv.almacen_id == almacen_id, Inv.presentacion_id == tabla.c.presentacion_id).values(
+                cantidad=tabla.c.cantidad,
+                alerta_desde=case((tabla.c.cantidad < Inv.stock_minimo, func.coalesce(Inv.alerta_desde, func.now())), else_=None),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        ahora = datetime.now(timezone.utc)
+        db.execute(insert(models.Movimiento), [
+            {
+                "tipo": "entrada" if d > 0 else "salida", "presentacion_id": int(pid), "almacen_id": almacen_id,
+                "lote_id": lotes.get(int(pid)), "usuario_id": current_user_id, "cantidad": Decimal(abs(int(d))),
+                "fecha": ahora, "motivo": f"Conteo físico {referencia}",
+            }
+            for pid, d in zip(presentacion_ids[con_diferencia], diferencias[con_diferencia])
+        ])
+        db.commit()
+        db.expire_all()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error SQLAlchemy al aplicar conteo en Alm {almacen_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al aplicar el conteo.")
+
+    resultado["referencia"] = f"Conteo físico {referencia}"
+    logger.info(f"Conteo {referencia} aplicado en Alm {almacen_id}: {len(resultado['diferencias'])} ajustes")
+    return resultado
+
+
+# --- Sugerencias de rebalanceo entre almacenes ---
+
+def suggest_rebalanceo(db: Session, dias: int = 14, presentacion_id: int | None = None) -> list[dict]:
+    """
+    Propone transferencias desde almacenes con excedente hacia los que, según el pronóstico
+    de demanda, quedarían bajo stock_minimo en `dias` días. Proyección, faltantes y excedentes
+    se calculan vectorizados para todas las filas; la asignación es greedy por presentación
+    (el destino con menos días de cobertura recibe primero, del origen con más excedente).
+    Devuelve las sugerencias ordenadas por urgencia; no modifica nada.
+    """
+    Inv, PD = models.Inventario, models.PronosticoDemanda
+    query = db.query(
+        Inv.presentacion_id, Inv.almacen_id, Inv.cantidad, Inv.stock_minimo,
+        func.coalesce(PD.nivel, 0).label("demanda_diaria"),
+    ).outerjoin(PD, (PD.presentacion_id == Inv.presentacion_id) & (PD.almacen_id == Inv.almacen_id))
+    if presentacion_id:
+        query = query.filter(Inv.presentacion_id == presentacion_id)
+    filas = query.all()
+    if not filas:
+        return []
+
+    presentaciones = np.array([f.presentacion_id for f in filas], dtype=np.int64)
+    almacenes = np.array([f.almacen_id for f in filas], dtype=np.int64)
+    cantidad = np.array([f.cantidad for f in filas], dtype=np.int64)
+    minimo = np.array([f.stock_minimo for f in filas], dtype=np.int64)
+    demanda = np.array([f.demanda_diaria for f in filas], dtype=np.float64)
+
+    proyectado = cantidad - demanda * dias
+    faltante = np.ceil(np.maximum(minimo - proyectado, 0)).astype(np.int64)
+    # Excedente: lo que sobra sobre el mínimo tras cubrir la demanda propia (nunca más que el stock)
+    excedente = np.floor(np.clip(proyectado - minimo, 0, cantidad)).astype(np.int64)
+    with np.errstate(divide="ignore"):
+        cobertura = np.where(demanda > 0, cantidad / demanda, np.inf)
+
+    # Agrupar por presentación y quedarse solo con las que tienen faltante y excedente a la vez
+    orden = np.argsort(presentaciones, kind="stable")
+    ids, inicio = np.unique(presentaciones[orden], return_index=True)
+    grupos = np.split(orden, inicio[1:])
+    total_faltante = np.add.reduceat(faltante[orden], inicio)
+    total_excedente = np.add.reduceat(excedente[orden], inicio)
+
+    sugerencias = []
+    for g in np.flatnonzero((total_faltante > 0) & (total_excedente > 0)):
+        filas_grupo = grupos[g]
+        destinos = filas_grupo[faltante[filas_grupo] > 0]
+        destinos = destinos[np.argsort(cobertura[destinos], kind="stable")]
+        origenes = filas_grupo[excedente[filas_grupo] > 0]
+        origenes = origenes[np.argsort(-excedente[origenes], kind="stable")]
+        disponible = excedente[origenes].copy()
+        for d in destinos:
+            pendiente = faltante[d]
+            for k, o in enumerate(origenes):
+                if pendiente == 0:
+                    break
+                mover = min(pendiente, disponible[k])
+                if mover == 0:
+                    continue
+                disponible[k] -= mover
+                pendiente -= mover
+                sugerencias.append({
+                    "presentacion_id": int(ids[g]),
+                    "almacen_origen_id": int(almacenes[o]),
+                    "almacen_destino_id": int(almacenes[d]),
+                    "cantidad": int(mover),
+                    "stock_origen": int(cantidad[o]),
+                    "stock_destino": int(cantidad[d]),
+                    "stock_minimo_destino": int(minimo[d]),
+                    "dias_cobertura_destino": round(float(cobertura[d]), 1) if np.isfinite(cobertura[d]) else None,
+                })
+
+    # Más urgente primero: menor cobertura en destino (sin demanda pronosticada al final), luego mayor cantidad
+    sugerencias.sort(key=lambda s: (
+        s["dias_cobertura_destino"] is None, s["dias_cobertura_destino"] or 0, -s["cantidad"]
+    ))
+    return sugerencias
+
+
+# --- Fotos de inventario (stock a una fecha) ---
+
+def _delta_movimientos():
+    """Suma neta de movimientos (entradas positivas, salidas negativas)."""
+    return func.sum(case(
+        (models.Movimiento.tipo == 'entrada', models.Movimiento.cantidad),
+        else_=-models.Movimiento.cantidad,
+    ))
+
+def _fin_del_dia(dia: date) -> datetime:
+    return datetime.combine(dia + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+def _select_stock_hacia_atras(momento: datetime):
+    """
+    SELECT del stock en `momento` partiendo del inventario actual y deshaciendo
+    los movimientos posteriores. Exacto mientras el libro de movimientos esté completo.
+    """
+    posteriores = select(
+        models.Movimiento.presentacion_id,
+        models.Movimiento.almacen_id,
+        _delta_movimientos().label("delta"),
+    ).where(
+        models.Movimiento.fecha > momento,
+        models.Movimiento.almacen_id.isnot(None),
+    ).group_by(models.Movimiento.presentacion_id, models.Movimiento.almacen_id).subquery()
+    Inv = models.Inventario
+    return select(
+        Inv.presentacion_id,
+        Inv.almacen_id,
+        (Inv.cantidad - func.coalesce(posteriores.c.delta, 0)).label("cantidad"),
+    ).outerjoin(posteriores, (posteriores.c.presentacion_id == Inv.presentacion_id) & (posteriores.c.almacen_id == Inv.almacen_id))
+
+def _guardar_snapshots(db: Session, fecha: date, tomado_en: datetime, origen, sobrescribir: bool) -> int:
+    """INSERT ... SELECT de la foto; no trae las filas a Python."""
+    columnas = origen.subquery()
+    stmt = pg_insert(models.InventarioSnapshot).from_select(
+        ["fecha", "tomado_en", "presentacion_id", "almacen_id", "cantidad"],
+        select(literal(fecha), literal(tomado_en), columnas.c.presentacion_id, columnas.c.almacen_id, func.round(columnas.c.cantidad)),
+    )
+    if sobrescribir:
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_snapshot_fecha_presentacion_almacen',
+            set_={"cantidad": stmt.excluded.cantidad, "tomado_en": stmt.excluded.tomado_en},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(constraint='uq_snapshot_fecha_presentacion_almacen')
+    return db.execute(stmt).rowcount
+
+def take_snapshot(db: Session) -> int:
+    """Guarda la foto del inventario actual (tarea nocturna). Devuelve las filas guardadas."""
+    ahora = datetime.now(timezone.utc)
+    Inv = models.Inventario
+    filas = _guardar_snapshots(
+        db, ahora.date(), ahora, select(Inv.presentacion_id, Inv.almacen_id, Inv.cantidad), sobrescribir=True
+    )
+    db.commit()
+    logger.info(f"Foto de inventario {ahora.date()}: {filas} registros")
+    return filas
+
+def backfill_snapshots(db: Session, desde: date, hasta: date, mensual: bool = False) -> int:
+    """
+    Genera fotos históricas (diarias o de fin de mes) reconstruyéndolas desde el inventario
+    actual. No sobrescribe fotos existentes. Devuelve cuántas fechas se procesaron.
+    """
+    fechas = []
+    dia = desde
+    while dia <= hasta:
+        siguiente = dia + timedelta(days=1)
+        if not mensual or siguiente.day == 1:
+            fechas.append(dia)
+        dia = siguiente
+
+    for dia in fechas:
+        momento = _fin_del_dia(dia)
+        filas = _guardar_snapshots(db, dia, momento, _select_stock_hacia_atras(momento), sobrescribir=False)
+        db.commit() # Una transacción por fecha para no retener bloqueos
+        logger.info(f"Foto histórica {dia}: {filas} registros nuevos")
+    return len(fechas)
+
+def close_month(db: Session, anio: int, mes: int) -> date:
+    """Guarda la foto exacta al cierre del mes indicado y devuelve su fecha (último día del mes)."""
+    ultimo_dia = (date(anio + mes // 12, mes % 12 + 1, 1) - timedelta(days=1))
+    momento = _fin_del_dia(ultimo_dia)
+    if momento > datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"El mes {anio}-{mes:02d} aún no ha terminado.")
+    try:
+        filas = _guardar_snapshots(db, ultimo_dia, momento, _select_stock_hacia_atras(momento), sobrescribir=True)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error SQLAlchemy al cerrar el mes {anio}-{mes:02d}: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al generar el cierre.")
+    logger.info(f"Cierre de inventario {anio}-{mes:02d}: {filas} registros")
+    return ultimo_dia
+
+def get_stock_as_of(
+    db: Session,
+    momento: datetime,
+    almacen_id: int | None = None,
+    presentacion_id: int | None = None,
+) -> list[dict]:
+    """
+    Stock en `momento`: la foto más cercana anterior de cada presentación/almacén
+    más los movimientos posteriores a ella (sin recorrer todo el historial).
+    """
+    Snap = models.InventarioSnapshot
+    Mov = models.Movimiento
+    fotos = db.query(Snap.presentacion_id, Snap.almacen_id, Snap.cantidad, Snap.tomado_en).filter(Snap.tomado_en <= momento)
+    if almacen_id:
+        fotos = fotos.filter(Snap.almacen_id == almacen_id)
+    if presentacion_id:
+        fotos = fotos.filter(Snap.presentacion_id == presentacion_id)
+    # DISTINCT ON: la foto más reciente de cada par (usa idx_snapshot_almacen_tomado)
+    fotos = fotos.distinct(Snap.presentacion_id, Snap.almacen_id).order_by(
+        Snap.presentacion_id, Snap.almacen_id, Snap.tomado_en.desc()
+    ).subquery()
+
+    deltas = db.query(
+        Mov.presentacion_id, Mov.almacen_id, _delta_movimientos().label("delta")
+    ).outerjoin(fotos, (fotos.c.presentacion_id == Mov.presentacion_id) & (fotos.c.almacen_id == Mov.almacen_id)
+    ).filter(
+        Mov.fecha <= momento,
+        Mov.almacen_id.isnot(None),
+        (fotos.c.tomado_en.is_(None)) | (Mov.fecha > fotos.c.tomado_en),
+    )
+    if almacen_id:
+        deltas = deltas.filter(Mov.almacen_id == almacen_id)
+    if presentacion_id:
+        deltas = deltas.filter(Mov.presentacion_id == presentacion_id)
+    deltas = deltas.group_by(Mov.presentacion_id, Mov.almacen_id)
+
+    stock = {(f.presentacion_id, f.almacen_id): Decimal(f.cantidad) for f in db.query(fotos).all()}
+    for d in deltas.all():
+        clave = (d.presentacion_id, d.almacen_id)
+        stock[clave] = stock.get(clave, Decimal(0)) + d.delta
+    return [
+        {"presentacion_id": pid, "almacen_id": aid, "cantidad": int(round(cantidad))}
+        for (pid, aid), cantidad in sorted(stock.items())
+    ]
@@ -0,0 +1,116 @@
+# app/services/service_lote.py
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, text
+from concurrent.futures import ThreadPoolExecutor
+from app import models
+from app.db.session import SessionLocal
+from decimal import Decimal
+from collections import defaultdict
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def allocate_fifo(db: Session, lineas: list[tuple[int, int, Decimal]]) -> list[dict]:
+    """
+    Descuenta de los lotes más antiguos de cada producto (FIFO) los kg vendidos.
+    `lineas` son tuplas (venta_detalle_id, producto_id, kg). Todos los lotes candidatos
+    se bloquean en una sola consulta ordenada por ID (el mismo orden que usan
+    release_allocations y las mermas: sin interbloqueos), se ordenan en memoria por
+    antigüedad y las asignaciones se insertan en bloque.
+    No hace commit. Devuelve las asignaciones creadas.
+    """
+    productos = {producto_id for _, producto_id, _ in lineas}
+    if not productos:
+        return []
+    lotes = db.query(models.Lote).filter(
+        models.Lote.producto_id.in_(productos),
+        models.Lote.cantidad_disponible_kg > 0,
+    ).order_by(models.Lote.id).with_for_update().all()
+
+    cola = defaultdict(list) # producto_id -> lotes con saldo, del más antiguo al más nuevo
+    # Orden FIFO (igual que ORDER BY fecha_ingreso, id: sin fecha al final)
+    for lote in sorted(lotes, key=lambda l: (l.fecha_ingreso is None, l.fecha_ingreso, l.id)):
+        cola[lote.producto_id].append(lote)
+
+    asignaciones = []
+    for venta_detalle_id, producto_id, kg in lineas:
+        pendiente = Decimal(kg)
+        disponibles = cola[producto_id]
+        while pendiente > 0 and disponibles:
+            lote = disponibles[0]
+            tomado = min(pendiente, lote.cantidad_disponible_kg)
+            lote.cantidad_disponible_kg -= tomado
+            pendiente -= tomado
+            asignaciones.append({"venta_detalle_id": venta_detalle_id, "lote_id": lote.id, "cantidad_kg": tomado})
+            if lote.cantidad_disponible_kg <= 0:
+                disponibles.pop(0)
+        if pendiente > 0:
+            # La venta no se bloquea: el stock manda sobre el saldo de los lotes
+            logger.warning(f"Lotes insuficientes para detalle ID {venta_detalle_id} (Producto {producto_id}): faltan {pendiente} kg")
+
+    if asignaciones:
+        db.execute(insert(models.VentaDetalleLote), asignaciones)
+    return asignaciones
+
+
+def release_allocations(db: Session, venta_id: int) -> int:
+    """
+    Devuelve a sus lotes los kg asignados a una venta (al eliminarla). Las asignaciones
+    se borran en cascada con los detalles. No hace commit. Devuelve los lotes afectados.
+    """
+    devoluciones = defaultdict(Decimal)
+    filas = db.query(models.VentaDetalleLote.lote_id, models.VentaDetalleLote.cantidad_kg).join(
+        models.VentaDetalle, models.VentaDetalle.id == models.VentaDetalleLote.venta_detalle_id
+    ).filter(models.VentaDetalle.venta_id == venta_id).all()
+    for lote_id, cantidad_kg in filas:
+        devoluciones[lote_id] += cantidad_kg
+    if not devoluciones:
+        return 0
+
+    lotes = db.query(models.Lote).filter(
+        models.Lote.id.in_(devoluciones)
+    ).order_by(models.Lote.id).with_for_update().all()
+    for lote in lotes:
+        lote.cantidad_disponible_kg = (lote.cantidad_disponible_kg or Decimal(0)) + devoluciones[lote.id]
+    return len(lotes)
+
+
+# --- Rendimiento de lotes (vista materializada lote_rendimiento) ---
+
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rendimiento")
+_refresh_lock = threading.Lock()
+_refresh_pendiente = False
+
+
+def refresh_rendimiento(db: Session) -> None:
+    """Recalcula la vista sin bloquear las lecturas (CONCURRENTLY)."""
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY lote_rendimiento"))
+    db.commit()
+
+
+def schedule_refresh_rendimiento() -> None:
+    """
+    Programa un refresco en segundo plano. Las peticiones que llegan mientras hay uno
+    en cola se agrupan en él (varias mermas seguidas provocan un solo refresco).
+    """
+    global _refresh_pendiente
+    with _refresh_lock:
+        if _refresh_pendiente:
+            return
+        _refresh_pendiente = True
+    _refresh_executor.submit(_refresh_in_new_session)
+
+
+def _refresh_in_new_session() -> None:
+    global _refresh_pendiente
+    with _refresh_lock:
+        _refresh_pendiente = False # Los cambios posteriores a este punto piden otro refresco
+    db = SessionLocal()
+    try:
+        refresh_rendimiento(db)
+    except Exception as e:
+        logger.error(f"Error refrescando lote_rendimiento: {e}", exc_info=True)
+    finally:
+        db.close()
@@ -1,8 +1,12 @@
 # app/services/service_merma.py
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import insert
 from fastapi import HTTPException, status
 from app import models, schemas, crud
+from app.services import service_lote
+from decimal import Decimal
+from datetime import datetime, timezone
 import logging
 from typing import TYPE_CHECKING
 
@@ -33,6 +37,7 @@ def create_merma_and_update_lote(db: Session, merma: schemas.MermaCreate, curren
         db.refresh(db_merma)
         db.refresh(lote)
         logger.info(f"Merma ID {db_merma.id} creada para Lote ID {lote.id}")
+        service_lote.schedule_refresh_rendimiento()
         return db_merma
 
     except (SQLAlchemyError, ValueError) as e: # Captura errores de BD o validación de cantidad
@@ -41,4 +46,59 @@ def create_merma_and_update_lote(db: Session, merma: schemas.MermaCreate, curren
         # Determinar el código de estado adecuado
         status_code = status.HTTP_409_CONFLICT if isinstance(e, ValueError) else status.HTTP_500_INTERNAL_SERVER_ERROR
         detail = str(e) if isinstance(e, ValueError) else "Error interno al registrar la merma."
-        raise HTTPException(status_code=status_code, detail=detail)
\ No newline at end of file
+        raise HTTPException(status_code=status_code, detail=detail)
+
+
+def create_mermas_batch(
+    db: Session,
+    mermas: list[schemas.MermaCreate],
+    current_user_id: int | None = None,
+) -> tuple[list[int], list[dict]]:
+    """
+    Registra varias mermas en una sola transacción. Los lotes se bloquean una sola vez
+    (en orden de ID) y cada merma se valida contra lo que queda del lote tras las
+    anteriores del mismo lote. Las inválidas se reportan y no impiden registrar el resto.
+    Devuelve (ids creados, errores por ítem).
+    """
+    lote_ids = sorted({m.lote_id for m in mermas})
+    try:
+        lotes = {
+            lote.id: lote for lote in db.query(models.Lote).filter(
+                models.Lote.id.in_(lote_ids)
+            ).order_by(models.Lote.id).with_for_update().all()
+        }
+
+        filas, errores = [], []
+        ahora = datetime.now(timezone.utc)
+        for indice, merma in enumerate(mermas):
+            lote = lotes.get(merma.lote_id)
+            if lote is None:
+                errores.append({"indice": indice, "lote_id": merma.lote_id, "detalle": "Lote no encontrado."})
+                continue
+            disponible = lote.cantidad_disponible_kg or Decimal(0)
+            if disponible < merma.cantidad_kg:
+                errores.append({
+                    "indice": indice, "lote_id": merma.lote_id,
+                    "detalle": f"Cantidad insuficiente en lote {lote.id}. Disponible: {disponible}",
+                })
+                continue
+            lote.cantidad_disponible_kg = disponible - merma.cantidad_kg
+            datos = merma.model_dump()
+            datos["usuario_id"] = current_user_id or datos.get("usuario_id")
+            datos["fecha_registro"] = ahora
+            filas.append(datos)
+
+        ids = []
+        if filas:
+            # Un solo INSERT (multi-VALUES) para todas las mermas válidas
+            ids = list(db.execute(insert(models.Merma).returning(models.Merma.id, sort_by_parameter_order=True), filas).scalars())
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error SQLAlchemy al registrar lote de {len(mermas)} mermas: {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al registrar las mermas.")
+
+    logger.info(f"Registro masivo de mermas: {len(ids)} creadas, {len(errores)} con error")
+    if ids:
+        service_lote.schedule_refresh_rendimiento()
+    return ids, errores
@@ -2,7 +2,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
-from app import models, schemas, crud
+from app import models, schemas, crud, services
 import logging
 from decimal import Decimal
 from typing import TYPE_CHECKING
@@ -65,6 +65,8 @@ def delete_pago_and_update_venta(db: Session, pago_id: int) -> "Pago":
     try:
         db.delete(pago)
         _actualizar_estado_venta(db, venta, pago_eliminado_id=pago_id)
+        # El comprobante se elimina del almacenamiento en segundo plano (outbox)
+        services.service_archivo.enqueue_deletion(db, pago.url_comprobante)
         db.commit()
         if venta:
             db.refresh(venta)
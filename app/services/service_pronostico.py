@@ -0,0 +1,280 @@
+# app/services/service_pronostico.py
+from sqlalchemy.orm import Session
+from sqlalchemy import text, update, values, column, cast, func, Integer, Date, DateTime, Numeric
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app import models
+from datetime import date, datetime, timedelta, timezone
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# --- Frecuencia de compra de clientes ---
+
+HISTORIAL_COMPRAS = 12 # Compras recientes por cliente usadas para estimar la frecuencia
+
+# Compras por cliente y día (UTC) con el intervalo hasta la compra anterior (LAG) y los kg
+# de esa compra anterior, que son los que el cliente consumió durante el intervalo
+_SELECT_INTERVALOS = text("""
+    WITH compras AS (
+        SELECT v.cliente_id, (v.fecha AT TIME ZONE 'UTC')::date AS dia, MAX(v.fecha) AS ultima,
+               SUM(d.cantidad * p.capacidad_kg) AS kg
+        FROM ventas v
+        JOIN venta_detalles d ON d.venta_id = v.id
+        JOIN presentaciones_producto p ON p.id = d.presentacion_id
+        GROUP BY v.cliente_id, (v.fecha AT TIME ZONE 'UTC')::date
+    ), intervalos AS (
+        SELECT cliente_id, ultima,
+               dia - LAG(dia) OVER w AS dias,
+               LAG(kg) OVER w AS kg_previo,
+               ROW_NUMBER() OVER (PARTITION BY cliente_id ORDER BY dia DESC) AS reciente
+        FROM compras
+        WINDOW w AS (PARTITION BY cliente_id ORDER BY dia)
+    )
+    SELECT cliente_id, ultima, dias, kg_previo, reciente
+    FROM intervalos
+    WHERE reciente <= :historial
+    ORDER BY cliente_id, reciente
+""")
+
+
+def compute_frecuencias(db: Session, historial: int = HISTORIAL_COMPRAS) -> int:
+    """
+    Recalcula, para todos los clientes, la frecuencia de compra (mediana de días entre compras)
+    y el consumo en kg/día (kg comprados / días transcurridos) a partir de sus últimas compras.
+    El post-proceso es vectorizado y la actualización es un solo UPDATE ... FROM VALUES.
+    Devuelve el número de clientes actualizados.
+    """
+    filas = db.execute(_SELECT_INTERVALOS, {"historial": historial}).all()
+    if not filas:
+        return 0
+
+    # Última compra: la fila más reciente de cada cliente (vienen ordenadas por cliente, reciente)
+    ultimas = {f.cliente_id: f.ultima for f in filas if f.reciente == 1}
+    # Intervalos: la primera compra del historial no tiene anterior (dias NULL)
+    con_intervalo = [f for f in filas if f.dias is not None and f.dias > 0]
+    clientes = np.array([f.cliente_id for f in con_intervalo], dtype=np.int64)
+    dias = np.array([f.dias for f in con_intervalo], dtype=np.float64)
+    kg = np.array([f.kg_previo for f in con_intervalo], dtype=np.float64)
+
+    frecuencias, consumos = {}, {}
+    if len(clientes):
+        # Ordenar por cliente y, dentro de cada cliente, por intervalo: la mediana queda en el centro
+        orden = np.lexsort((dias, clientes))
+        clientes, dias, kg = clientes[orden], dias[orden], kg[orden]
+        ids, inicio, cuenta = np.unique(clientes, return_index=True, return_counts=True)
+        mediana = (dias[inicio + (cuenta - 1) // 2] + dias[inicio + cuenta // 2]) / 2
+        ritmo = np.add.reduceat(kg, inicio) / np.add.reduceat(dias, inicio)
+        frecuencias = dict(zip(ids.tolist(), np.maximum(np.rint(mediana), 1).astype(np.int64).tolist()))
+        consumos = dict(zip(ids.tolist(), np.round(ritmo, 3).tolist()))
+
+    tabla = values(
+        column("id", Integer), column("frecuencia", Integer), column("consumo", Numeric), column("ultima", DateTime(timezone=True)),
+        name="f",
+    ).data([
+        (cliente_id, frecuencias.get(cliente_id), consumos.get(cliente_id), ultima)
+        for cliente_id, ultima in ultimas.items()
+    ])
+    Cliente = models.Cliente
+    try:
+        # Con una sola compra no hay intervalo: se conserva la frecuencia registrada manualmente
+        db.execute(
+            update(Cliente).where(Cliente.id == tabla.c.id).values(
+                frecuencia_compra_dias=func.coalesce(cast(tabla.c.frecuencia, Integer), Cliente.frecuencia_compra_dias),
+                consumo_kg_dia=func.coalesce(cast(tabla.c.consumo, Numeric(10, 3)), Cliente.consumo_kg_dia),
+                ultima_fecha_compra=cast(tabla.c.ultima, DateTime(timezone=True)),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.error("Error guardando las frecuencias de compra", exc_info=True)
+        raise
+    db.expire_all()
+    logger.info(f"Frecuencias de compra recalculadas: {len(ultimas)} clientes ({len(frecuencias)} con intervalos)")
+    return len(ultimas)
+
+
+# --- Reposición de clientes (clientes por visitar) ---
+
+# Una fila por cliente: su última compra (fecha UTC y almacén) y su consumo diario
+# (el observado por compute_frecuencias o, si no hay, el último declarado en una venta)
+_SELECT_CLIENTES = text("""
+    SELECT c.id, c.frecuencia_compra_dias,
+           COALESCE(u.dia, (c.ultima_fecha_compra AT TIME ZONE 'UTC')::date) AS ultima,
+           COALESCE(u.almacen_id, c.almacen_id) AS almacen_id,
+           COALESCE(c.consumo_kg_dia, k.consumo_diario_kg) AS consumo_diario_kg
+    FROM clientes c
+    LEFT JOIN (
+        SELECT DISTINCT ON (cliente_id) cliente_id, (fecha AT TIME ZONE 'UTC')::date AS dia, almacen_id
+        FROM ventas ORDER BY cliente_id, fecha DESC
+    ) u ON u.cliente_id = c.id
+    LEFT JOIN (
+        SELECT DISTINCT ON (cliente_id) cliente_id, consumo_diario_kg
+        FROM ventas WHERE consumo_diario_kg > 0 ORDER BY cliente_id, fecha DESC
+    ) k ON k.cliente_id = c.id
+    ORDER BY c.id
+""")
+
+
+def forecast_reposicion(db: Session, hoy: date | None = None) -> dict:
+    """
+    Calcula para todos los clientes la próxima compra esperada (última compra + frecuencia)
+    y los kg que necesitarán (consumo diario x días transcurridos al visitarlos), con NumPy
+    (ejecutar después de compute_frecuencias)
+    sobre arreglos. Guarda almacen_id, proxima_compra y kg_esperado en un solo UPDATE.
+    """
+    hoy = np.datetime64(hoy or datetime.now(timezone.utc).date(), "D")
+    filas = db.execute(_SELECT_CLIENTES).all()
+    if not filas:
+        return {"clientes": 0, "con_pronostico": 0, "atrasados": 0}
+
+    ids = np.array([f.id for f in filas], dtype=np.int64)
+    ultima = np.array([f.ultima or "NaT" for f in filas], dtype="datetime64[D]")
+    frecuencia = np.array([f.frecuencia_compra_dias or np.nan for f in filas], dtype=np.float64)
+    consumo = np.array([f.consumo_diario_kg or np.nan for f in filas], dtype=np.float64)
+
+    valido = ~np.isnat(ultima) & (frecuencia > 0)
+    dias_ciclo = np.where(valido, frecuencia, 0).astype(np.int64)
+    proxima = ultima + dias_ciclo.astype("timedelta64[D]")
+    dias_atraso = np.maximum((hoy - proxima).astype(np.int64), 0)
+    # Si ya se pasó de la fecha, necesitará reponer también los días de atraso
+    dias_a_cubrir = np.maximum(dias_ciclo, (hoy - ultima).astype(np.int64))
+    kg = np.round(consumo * dias_a_cubrir, 2)
+    con_kg = valido & np.isfinite(kg)
+
+    tabla = values(
+        column("id", Integer), column("almacen_id", Integer), column("proxima_compra", Date), column("kg_esperado", Numeric),
+        name="p",
+    ).data([
+        (int(ids[i]), filas[i].almacen_id,
+         proxima[i].item() if valido[i] else None,
+         float(kg[i]) if con_kg[i] else None)
+        for i in range(len(filas))
+    ])
+    Cliente = models.Cliente
+    try:
+        # Cast explícito: una columna de VALUES toda en NULL llega como text
+        db.execute(
+            update(Cliente).where(Cliente.id == tabla.c.id).values(
+                almacen_id=cast(tabla.c.almacen_id, Integer),
+                proxima_compra=cast(tabla.c.proxima_compra, Date),
+                kg_esperado=cast(tabla.c.kg_esperado, Numeric(10, 2)),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.error("Error guardando el pronóstico de reposición", exc_info=True)
+        raise
+    db.expire_all()
+
+    resumen = {
+        "clientes": len(filas),
+        "con_pronostico": int(valido.sum()),
+        "atrasados": int((valido & (dias_atraso > 0)).sum()),
+    }
+    logger.info(f"Pronóstico de reposición: {resumen}")
+    return resumen
+
+
+# --- Demanda por presentación y almacén ---
+
+ALFA_DEMANDA = 0.2 # Peso del día más reciente en el suavizado exponencial
+HORIZONTE_DIAS = 28 # Pronóstico a 4 semanas
+HISTORIAL_DIAS = 182 # Días de historia usados en un cálculo completo
+
+
+def refresh_pronostico_demanda(db: Session, completo: bool = False, hoy: date | None = None) -> dict:
+    """
+    Actualiza pronosticos_demanda con suavizado exponencial simple de las unidades diarias
+    de ventas_diarias, para todas las series (presentación, almacén) a la vez.
+    Incremental: parte del nivel guardado y solo procesa los días nuevos desde calculado_hasta;
+    las series sin estado parten de 0.
+    Con completo=True descarta el estado y recalcula con los últimos HISTORIAL_DIAS días.
+    """
+    hasta = (hoy or datetime.now(timezone.utc).date()) - timedelta(days=1) # Último día completo
+    PD, VD = models.PronosticoDemanda, models.VentaDiaria
+
+    estado = {} if completo else {
+        (f.presentacion_id, f.almacen_id): (float(f.nivel), f.calculado_hasta)
+        for f in db.query(PD.presentacion_id, PD.almacen_id, PD.nivel, PD.calculado_hasta)
+    }
+    if estado:
+        desde = max(calculado for _, calculado in estado.values()) + timedelta(days=1)
+    else:
+        desde = hasta - timedelta(days=HISTORIAL_DIAS - 1)
+    if desde > hasta:
+        logger.info(f"Pronóstico de demanda al día (calculado hasta {hasta})")
+        return {"series": 0, "dias": 0}
+
+    ventas = db.query(VD.presentacion_id, VD.almacen_id, VD.fecha, func.sum(VD.unidades).label("unidades")).filter(
+        VD.fecha >= desde, VD.fecha <= hasta
+    ).group_by(VD.presentacion_id, VD.almacen_id, VD.fecha).all()
+
+    # Matriz densa series x días (los días sin ventas quedan en 0)
+    series = sorted(set(estado) | {(v.presentacion_id, v.almacen_id) for v in ventas})
+    if not series:
+        return {"series": 0, "dias": 0}
+    posicion = {clave: i for i, clave in enumerate(series)}
+    dias = (hasta - desde).days + 1
+    demanda = np.zeros((len(series), dias), dtype=np.float64)
+    if ventas:
+        np.add.at(
+            demanda,
+            (np.array([posicion[(v.presentacion_id, v.almacen_id)] for v in ventas]),
+             np.array([(v.fecha - desde).days for v in ventas])),
+            np.array([v.unidades for v in ventas], dtype=np.float64),
+        )
+
+    # Nivel inicial: el guardado o, en series nuevas, el promedio de la ventana solo si esta es
+    # la historia completa (sin estado); en incrementales la ventana suele ser un día y una
+    # primera venta se proyectaría tal cual a todo el horizonte, así que empiezan en 0
+    inicial = 0.0 if estado else demanda.mean(axis=1)
+    nivel_previo = np.array([estado[clave][0] if clave in estado else np.nan for clave in series])
+    nivel_previo = np.where(np.isnan(nivel_previo), inicial, nivel_previo)
+    # L_n = (1-a)^n L_0 + sum_t a (1-a)^(n-1-t) y_t: la recurrencia completa como un producto matriz-vector
+    pesos = ALFA_DEMANDA * (1 - ALFA_DEMANDA) ** np.arange(dias - 1, -1, -1)
+    nivel = np.maximum((1 - ALFA_DEMANDA) ** dias * nivel_previo + demanda @ pesos, 0)
+
+    ahora = datetime.now(timezone.utc)
+    filas = [
+        {
+            "presentacion_id": presentacion_id, "almacen_id": almacen_id,
+            "nivel": round(float(nivel[i]), 4), "demanda_horizonte": round(float(nivel[i]) * HORIZONTE_DIAS, 2),
+            "calculado_hasta": hasta, "actualizado_en": ahora,
+        }
+        for i, (presentacion_id, almacen_id) in enumerate(series)
+    ]
+    stmt = pg_insert(PD)
+    stmt = stmt.on_conflict_do_update(
+        constraint='uq_pronostico_presentacion_almacen',
+        set_={columna: stmt.excluded[columna] for columna in ("nivel", "demanda_horizonte", "calculado_hasta", "actualizado_en")},
+    )
+    try:
+        if completo:
+            db.query(PD).delete(synchronize_session=False)
+        db.execute(stmt, filas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.error("Error guardando el pronóstico de demanda", exc_info=True)
+        raise
+    logger.info(f"Pronóstico de demanda: {len(series)} series, {dias} días ({desde} a {hasta})")
+    return {"series": len(series), "dias": dias}
+
+
+def get_pronosticos_demanda(
+    db: Session, almacen_id: int | None = None, presentacion_id: int | None = None, limit: int = 500
+) -> list:
+    """Pronósticos guardados, de mayor a menor demanda esperada."""
+    PD = models.PronosticoDemanda
+    query = db.query(PD)
+    if almacen_id:
+        query = query.filter(PD.almacen_id == almacen_id)
+    if presentacion_id:
+        query = query.filter(PD.presentacion_id == presentacion_id)
+    return query.order_by(PD.demanda_horizonte.desc(), PD.id).limit(limit).all()
@@ -0,0 +1,210 @@
+# app/services/service_reporte.py
+from sqlalchemy.orm import Session
+from sqlalchemy import text, func, cast, Date, Integer, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app import models
+from collections import defaultdict
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta, timezone
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.models import Venta
+
+logger = logging.getLogger(__name__)
+
+
+# --- Resumen diario de ventas (ventas_diarias) ---
+
+def upsert_ventas_diarias(db: Session, venta: "Venta", signo: int = 1) -> None:
+    """
+    Suma (signo=1) o resta (signo=-1) las líneas de una venta en el resumen diario.
+    Se llama dentro de la transacción de la venta; no hace commit.
+    """
+    if venta.vendedor_id is None:
+        logger.warning(f"Venta ID {venta.id} sin vendedor: no se incluye en ventas_diarias")
+        return
+    por_presentacion = defaultdict(lambda: [0, Decimal(0), Decimal(0)]) # unidades, kg, monto
+    for detalle in venta.detalles:
+        acumulado = por_presentacion[detalle.presentacion_id]
+        acumulado[0] += detalle.cantidad
+        acumulado[1] += detalle.cantidad * detalle.presentacion.capacidad_kg
+        acumulado[2] += detalle.cantidad * detalle.precio_unitario
+    if not por_presentacion:
+        return
+
+    # Día UTC, como en rebuild_ventas_diarias: al borrar, la fecha viene de la BD en la
+    # zona horaria de la conexión y debe restar de la misma fila en la que se sumó
+    dia = venta.fecha.astimezone(timezone.utc).date()
+    VD = models.VentaDiaria
+    stmt = pg_insert(VD).values([
+        {
+            "fecha": dia, "almacen_id": venta.almacen_id, "vendedor_id": venta.vendedor_id,
+            "presentacion_id": presentacion_id, "num_ventas": signo,
+            "unidades": signo * unidades, "kg": signo * kg, "monto": signo * monto,
+        }
+        for presentacion_id, (unidades, kg, monto) in por_presentacion.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint='uq_venta_diaria',
+        set_={
+            "num_ventas": VD.num_ventas + stmt.excluded.num_ventas,
+            "unidades": VD.unidades + stmt.excluded.unidades,
+            "kg": VD.kg + stmt.excluded.kg,
+            "monto": VD.monto + stmt.excluded.monto,
+        },
+    )
+    db.execute(stmt)
+
+
+_REBUILD_SQL = """
+    INSERT INTO ventas_diarias (fecha, almacen_id, vendedor_id, presentacion_id, num_ventas, unidades, kg, monto)
+    SELECT (v.fecha AT TIME ZONE 'UTC')::date, v.almacen_id, v.vendedor_id, d.presentacion_id,
+           count(DISTINCT v.id), sum(d.cantidad), sum(d.cantidad * p.capacidad_kg), sum(d.cantidad * d.precio_unitario)
+    FROM (
+        SELECT id, fecha, almacen_id, vendedor_id FROM ventas
+        UNION ALL
+        SELECT id, fecha, almacen_id, vendedor_id FROM ventas_archivo
+    ) v
+    JOIN (
+        SELECT venta_id, presentacion_id, cantidad, precio_unitario FROM venta_detalles
+        UNION ALL
+        SELECT venta_id, presentacion_id, cantidad, precio_unitario FROM venta_detalles_archivo
+    ) d ON d.venta_id = v.id
+    JOIN presentaciones_producto p ON p.id = d.presentacion_id
+    WHERE v.vendedor_id IS NOT NULL {filtro}
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def rebuild_ventas_diarias(db: Session, desde: date | None = None) -> int:
+    """
+    Regenera el resumen diario desde las ventas (incluidas las archivadas), completo o
+    a partir de `desde`. Se hace en una transacción: los lectores ven el resumen anterior
+    hasta el commit. Devuelve las filas generadas.
+    """
+    if desde:
+        db.execute(text("DELETE FROM ventas_diarias WHERE fecha >= :desde"), {"desde": desde})
+        sql = _REBUILD_SQL.format(filtro="AND (v.fecha AT TIME ZONE 'UTC')::date >= :desde")
+    else:
+        db.execute(text("DELETE FROM ventas_diarias"))
+        sql = _REBUILD_SQL.format(filtro="")
+    filas = db.execute(text(sql), {"desde": desde}).rowcount
+    db.commit()
+    logger.info(f"ventas_diarias regenerada{f' desde {desde}' if desde else ''}: {filas} filas")
+    return filas
+
+
+# --- Reportes (leen solo de los resúmenes) ---
+
+PERIODOS = {"dia": "day", "semana": "week", "mes": "month"}
+
+
+def _grupo_ventas(agrupar: str):
+    """Columnas (id, nombre) del grupo y joins necesarios sobre ventas_diarias."""
+    VD = models.VentaDiaria
+    if agrupar == "almacen":
+        return VD.almacen_id, models.Almacen.nombre, [(models.Almacen, models.Almacen.id == VD.almacen_id)]
+    if agrupar == "vendedor":
+        return VD.vendedor_id, models.Users.username, [(models.Users, models.Users.id == VD.vendedor_id)]
+    pres_join = (models.PresentacionProducto, models.PresentacionProducto.id == VD.presentacion_id)
+    if agrupar == "producto":
+        return models.Producto.id, models.Producto.nombre, [
+            pres_join, (models.Producto, models.Producto.id == models.PresentacionProducto.producto_id)
+        ]
+    if agrupar == "tipo":
+        return literal(None, type_=Integer), models.PresentacionProducto.tipo, [pres_join]
+    raise ValueError(f"Agrupación no soportada: {agrupar}")
+
+
+def get_ventas_series(
+    db: Session,
+    periodo: str = "dia",
+    agrupar: str = "almacen",
+    desde: date | None = None,
+    hasta: date | None = None,
+    almacen_id: int | None = None,
+) -> list:
+    """Serie temporal de ventas (unidades, kg, monto) por periodo y grupo, desde ventas_diarias."""
+    VD = models.VentaDiaria
+    inicio_periodo = cast(func.date_trunc(PERIODOS[periodo], VD.fecha), Date).label("periodo")
+    grupo_id, grupo_nombre, joins = _grupo_ventas(agrupar)
+    query = db.query(
+        inicio_periodo,
+        grupo_id.label("grupo_id"),
+        grupo_nombre.label("grupo"),
+        func.sum(VD.unidades).label("unidades"),
+        func.sum(VD.kg).label("kg"),
+        func.sum(VD.monto).label("monto"),
+    ).select_from(VD)
+    for entidad, condicion in joins:
+        query = query.join(entidad, condicion)
+    if desde:
+        query = query.filter(VD.fecha >= desde)
+    if hasta:
+        query = query.filter(VD.fecha <= hasta)
+    if almacen_id:
+        query = query.filter(VD.almacen_id == almacen_id)
+    # El tipo no tiene ID: agrupar por el literal NULL no es válido en PostgreSQL
+    claves = [inicio_periodo, grupo_nombre] if agrupar == "tipo" else [inicio_periodo, grupo_id, grupo_nombre]
+    return query.group_by(*claves).order_by(inicio_periodo, grupo_nombre).all()
+
+
+# Solo recorre ventas con saldo: el predicado coincide con el índice parcial idx_venta_pendiente
+_CARTERA_SQL = """
+WITH pendientes AS (
+    SELECT v.cliente_id, v.almacen_id, (v.fecha AT TIME ZONE 'UTC')::date AS dia,
+           v.total - COALESCE((
+               SELECT SUM(p.monto) FROM pagos p WHERE p.venta_id = v.id AND p.fecha < :fin_corte
+           ), 0) AS saldo
+    FROM ventas v
+    WHERE {estado} AND v.fecha < :fin_corte {filtro}
+)
+SELECT pe.cliente_id, c.nombre AS cliente, pe.almacen_id, a.nombre AS almacen,
+       COUNT(*) AS num_ventas, MIN(pe.dia) AS venta_mas_antigua,
+       COALESCE(SUM(pe.saldo) FILTER (WHERE :corte - pe.dia <= 30), 0) AS dias_0_30,
+       COALESCE(SUM(pe.saldo) FILTER (WHERE :corte - pe.dia BETWEEN 31 AND 60), 0) AS dias_31_60,
+       COALESCE(SUM(pe.saldo) FILTER (WHERE :corte - pe.dia BETWEEN 61 AND 90), 0) AS dias_61_90,
+       COALESCE(SUM(pe.saldo) FILTER (WHERE :corte - pe.dia > 90), 0) AS dias_90_mas,
+       SUM(pe.saldo) AS total
+FROM pendientes pe
+JOIN clientes c ON c.id = pe.cliente_id
+JOIN almacenes a ON a.id = pe.almacen_id
+WHERE pe.saldo > 0
+GROUP BY pe.cliente_id, c.nombre, pe.almacen_id, a.nombre
+ORDER BY dias_90_mas DESC, total DESC
+"""
+
+
+def get_cartera(
+    db: Session,
+    fecha_corte: date | None = None,
+    almacen_id: int | None = None,
+    cliente_id: int | None = None,
+) -> list:
+    """
+    Antigüedad de saldos (0-30, 31-60, 61-90, 90+ días) por cliente y almacén al cierre
+    (UTC) de la fecha de corte: solo ventas y pagos hasta ese día. Con un corte pasado
+    también entran las ventas pagadas después del corte (sin usar el índice parcial);
+    las ya archivadas no, así que el corte no debe ser anterior al periodo de retención.
+    """
+    hoy = datetime.now(timezone.utc).date()
+    fecha_corte = fecha_corte or hoy
+    params = {
+        "corte": fecha_corte,
+        "fin_corte": datetime.combine(fecha_corte + timedelta(days=1), time.min, tzinfo=timezone.utc),
+    }
+    estado = "v.estado_pago <> 'pagado'"
+    if fecha_corte < hoy:
+        estado = (
+            f"({estado} OR EXISTS (SELECT 1 FROM pagos p WHERE p.venta_id = v.id AND p.fecha >= :fin_corte))"
+        )
+    filtros = []
+    if almacen_id:
+        filtros.append("AND v.almacen_id = :almacen_id")
+        params["almacen_id"] = almacen_id
+    if cliente_id:
+        filtros.append("AND v.cliente_id = :cliente_id")
+        params["cliente_id"] = cliente_id
+    return db.execute(text(_CARTERA_SQL.format(estado=estado, filtro=" ".join(filtros))), params).all()
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from app import models, schemas, crud
+from app.services import service_lote, service_reporte
 from decimal import Decimal
 from datetime import datetime, timezone
 import logging # Usar logging en lugar de print
@@ -34,6 +35,7 @@ def create_venta_with_details(db: Session, venta_in: schemas.VentaCreate, vended
     total_venta_calculado = Decimal('0')
     detalles_orm = []
     inventarios_a_actualizar = {} # {presentacion_id: (inventario_obj, cantidad_a_restar)}
+    presentaciones = {} # {presentacion_id: presentacion} para la asignación de lotes
     movimientos_a_crear_data = [] # Guardar datos para crear movimientos
 
     # 1. Validar stock y preparar datos (dentro de la sesión para bloqueo)
@@ -64,6 +66,7 @@ def create_venta_with_details(db: Session, venta_in: schemas.VentaCreate, vended
         ))
 
         inventarios_a_actualizar[presentacion.id] = (inventario, detalle_in.cantidad)
+        presentaciones[presentacion.id] = presentacion
 
         movimientos_a_crear_data.append({
              "tipo": 'salida',
@@ -93,6 +96,7 @@ def create_venta_with_details(db: Session, venta_in: schemas.VentaCreate, vended
             mov_create = schemas.MovimientoCreate(
                 tipo=mov_data["tipo"],
                 presentacion_id=mov_data["presentacion_id"],
+                almacen_id=venta_in.almacen_id,
                 lote_id=mov_data["lote_id"],
                 cantidad=mov_data["cantidad"],
                 motivo=f"Venta ID: {venta_id} - {mov_data['motivo_base']}"
@@ -104,18 +108,22 @@ def create_venta_with_details(db: Session, venta_in: schemas.VentaCreate, vended
         # 4. Actualizar inventarios
         for inv, cantidad_vendida in inventarios_a_actualizar.values():
             inv.cantidad -= cantidad_vendida
+            crud.crud_inventario.sync_alerta_stock(inv)
             # No es necesario db.add(inv) si ya está en sesión y fue bloqueado
 
-        # 5. Actualizar proyección del cliente (si aplica)
-        if venta_in.consumo_diario_kg and venta_in.consumo_diario_kg > 0:
-             if cliente:
-                 cliente.ultima_fecha_compra = datetime.now(timezone.utc)
-                 try:
-                     if Decimal(venta_in.consumo_diario_kg) > 0:
-                          cliente.frecuencia_compra_dias = int(round(total_venta_calculado / Decimal(venta_in.consumo_diario_kg)))
-                 except Exception as calc_err:
-                      logger.error(f"Error calculando frecuencia compra cliente {cliente.id}: {calc_err}")
-                 # No es necesario db.add(cliente) si ya está en sesión
+        # 5. Consumir kg de los lotes del producto (FIFO)
+        service_lote.allocate_fifo(db, [
+            (detalle.id, presentaciones[detalle.presentacion_id].producto_id,
+             detalle.cantidad * presentaciones[detalle.presentacion_id].capacidad_kg)
+            for detalle in detalles_orm
+        ])
+
+        # 6. Resumen diario de ventas (misma transacción)
+        service_reporte.upsert_ventas_diarias(db, db_venta)
+
+        # 7. Última compra del cliente. La frecuencia de compra se recalcula por lotes
+        # (service_pronostico.compute_frecuencias), fuera de esta transacción
+        cliente.ultima_fecha_compra = datetime.now(timezone.utc)
 
         db.commit() # Commit de toda la transacción
         db.refresh(db_venta) # Refrescar para obtener estado final
@@ -159,6 +167,7 @@ def delete_venta_and_reverse(db: Session, venta_id: int, current_user_id: int) -
             mov_reversion = models.Movimiento(
                 tipo='entrada',
                 presentacion_id=mov.presentacion_id,
+                almacen_id=venta.almacen_id,
                 lote_id=mov.lote_id,
                 usuario_id=current_user_id,
                 cantidad=mov.cantidad, # Mantener tipo original
@@ -176,17 +185,22 @@ def delete_venta_and_reverse(db: Session, venta_id: int, current_user_id: int) -
 
             if inventario:
                 inventario.cantidad += int(round(cantidad_a_sumar)) # Asumiendo inventario es int
+                crud.crud_inventario.sync_alerta_stock(inventario)
                 # No se necesita db.add() si ya está en sesión
             else:
                 logger.warning(f"Inventario no encontrado para restaurar Venta ID {venta_id}, Pres ID {presentacion_id}, Alm ID {venta.almacen_id}")
                 # Considerar crear el registro de inventario aquí si es necesario
 
-        # 4. Eliminar Pagos asociados (si existen)
+        # 4. Devolver a los lotes los kg asignados (las asignaciones se borran en cascada)
+        service_lote.release_allocations(db, venta.id)
+        service_reporte.upsert_ventas_diarias(db, venta, signo=-1)
+
+        # 5. Eliminar Pagos asociados (si existen)
         pagos = db.query(models.Pago).filter(models.Pago.venta_id == venta.id).all()
         for pago in pagos:
             db.delete(pago)
 
-        # 5. Eliminar la Venta (detalles se eliminan por cascade)
+        # 6. Eliminar la Venta (detalles se eliminan por cascade)
         db.delete(venta)
         db.commit() # Commit de toda la transacción
         logger.info(f"Venta ID {venta_id} eliminada y revertida por Usuario ID {current_user_id}")
@@ -0,0 +1,51 @@
+# app/utils/cache.py
+from threading import Lock
+from typing import Any, Callable, Hashable
+import time
+
+
+class TTLCache:
+    """
+    Caché en memoria con expiración por entrada, para respuestas de consultas
+    agregadas. Es por proceso (cada instancia Lambda/worker tiene la suya), por
+    lo que solo sirve para datos que toleran unos segundos de desfase.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expira, value = entry
+            if expira < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return # Caché desactivada
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                ahora = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] >= ahora}
+                if len(self._data) >= self.max_entries:
+                    self._data.pop(next(iter(self._data))) # Descartar la más antigua
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
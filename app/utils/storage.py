@@ -0,0 +1,378 @@
+# app/utils/storage.py
+"""
+Backends de almacenamiento de archivos (local, S3, GCS).
+
+Los métodos de los backends son bloqueantes; desde código async usar `run_blocking`
+para ejecutarlos en el pool compartido. Clientes y pool viven a nivel de módulo,
+así que en Lambda se reutilizan entre invocaciones "calientes".
+"""
+import asyncio
+from abc import ABC, abstractmethod
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, partial
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import urlencode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pool compartido para llamadas bloqueantes (SDKs y disco)
+_executor = ThreadPoolExecutor(max_workers=settings.STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Ejecuta una función bloqueante en el pool de almacenamiento sin bloquear el event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    content_type: Optional[str] = None
+    updated: Optional[datetime] = None
+
+
+@dataclass
+class PresignedUpload:
+    """Datos para que el cliente suba el archivo directamente al almacenamiento."""
+    url: str
+    method: str # 'PUT' o 'POST' (formulario S3)
+    fields: dict = field(default_factory=dict) # Campos del formulario (POST)
+    headers: dict = field(default_factory=dict) # Cabeceras obligatorias (PUT)
+
+
+class StorageBackend(ABC):
+    """Interfaz común. `key` es la ruta relativa del objeto (ej: 'comprobantes/abc.jpg')."""
+
+    @abstractmethod
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        """Sube el contenido de `fileobj` por bloques y devuelve la URL pública."""
+
+    @abstractmethod
+    def download(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        """Tamaño y tipo de contenido del objeto, o None si no existe."""
+
+    @abstractmethod
+    def iter_objects(self, prefix: str) -> Iterator[ObjectInfo]:
+        """Recorre los objetos bajo `prefix` página a página, sin cargar el listado completo."""
+
+    @abstractmethod
+    def move(self, key: str, new_key: str) -> None:
+        ...
+
+    @abstractmethod
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> PresignedUpload:
+        """Genera una subida directa firmada, limitada a `content_type` y `max_size` bytes."""
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Obtiene la key a partir de una URL guardada en BD (o None si no pertenece al backend)."""
+        base = self.url_for("")
+        if url.startswith(base):
+            return url[len(base):]
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Guarda archivos en disco (desarrollo local)."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Key fuera del directorio de almacenamiento: {key}")
+        return path
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, settings.STORAGE_CHUNK_SIZE)
+        os.replace(tmp_path, path) # Evita dejar archivos a medio escribir con el nombre final
+        return self.url_for(key)
+
+    def download(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        return ObjectInfo(key=key, size=os.path.getsize(path), content_type=mimetypes.guess_type(path)[0])
+
+    def iter_objects(self, prefix: str) -> Iterator[ObjectInfo]:
+        base = self._path(prefix)
+        for dirpath, _, filenames in os.walk(base):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                st = os.stat(path)
+                yield ObjectInfo(
+                    key=os.path.relpath(path, self.root).replace(os.sep, "/"),
+                    size=st.st_size,
+                    updated=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+                )
+
+    def move(self, key: str, new_key: str) -> None:
+        new_path = self._path(new_key)
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        os.replace(self._path(key), new_path)
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> PresignedUpload:
+        # Firmador local: la URL apunta al endpoint PUT /uploads/local/{key} de la propia API
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            "content_type": content_type,
+            "max_size": max_size,
+            "expires": expires,
+            "signature": sign_local_upload(key, content_type, max_size, expires),
+        })
+        return PresignedUpload(
+            url=f"{settings.API_V1_STR}/uploads/local/{key}?{query}",
+            method="PUT",
+            headers={"Content-Type": content_type},
+        )
+
+
+def sign_local_upload(key: str, content_type: str, max_size: int, expires: int) -> str:
+    """Firma HMAC de una subida local (equivalente a la firma de S3/GCS)."""
+    message = f"{key}|{content_type}|{max_size}|{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_local_upload(key: str, content_type: str, max_size: int, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_local_upload(key, content_type, max_size, expires), signature)
+
+
+def sign_upload_token(key: str, user_id: int, destination: str, expires: int) -> str:
+    """
+    Token que liga una subida directa a quien la pidió: `expires.firma` sobre
+    (key, usuario, carpeta, expiración). Se exige al confirmar la subida.
+    """
+    message = f"upload|{key}|{user_id}|{destination}|{expires}".encode()
+    signature = hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def issue_upload_token(key: str, user_id: int, destination: str) -> str:
+    return sign_upload_token(key, user_id, destination, int(time.time()) + settings.UPLOAD_TOKEN_EXPIRE_SECONDS)
+
+
+def verify_upload_token(token: str, key: str, user_id: int, destination: str) -> bool:
+    try:
+        expires = int(token.split(".", 1)[0])
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_upload_token(key, user_id, destination, expires), token)
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """Cliente boto3 único por proceso (reutiliza el pool de conexiones HTTP)."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.session.Session().client(
+        "s3",
+        region_name=settings.AWS_REGION,
+        config=Config(
+            max_pool_connections=settings.STORAGE_MAX_WORKERS * 2,
+            retries={"max_attempts": 3, "mode": "standard"},
+        ),
+    )
+
+
+class S3Storage(StorageBackend):
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        from boto3.s3.transfer import TransferConfig
+
+        extra_args = {"ContentType": content_type} if content_type else {}
+        get_s3_client().upload_fileobj(
+            fileobj, self.bucket, key,
+            ExtraArgs=extra_args,
+            Config=TransferConfig(
+                multipart_chunksize=max(settings.STORAGE_CHUNK_SIZE, 5 * 1024 * 1024), # Mínimo de S3
+                use_threads=False, # Ya estamos dentro del pool de almacenamiento
+            ),
+        )
+        return self.url_for(key)
+
+    def download(self, key: str) -> bytes:
+        return get_s3_client().get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def delete(self, key: str) -> None:
+        get_s3_client().delete_object(Bucket=self.bucket, Key=key)
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = get_s3_client().head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return ObjectInfo(key=key, size=head["ContentLength"], content_type=head.get("ContentType"))
+
+    def iter_objects(self, prefix: str) -> Iterator[ObjectInfo]:
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/"):
+            for obj in page.get("Contents", []):
+                yield ObjectInfo(key=obj["Key"], size=obj["Size"], updated=obj["LastModified"])
+
+    def move(self, key: str, new_key: str) -> None:
+        client = get_s3_client()
+        client.copy_object(Bucket=self.bucket, Key=new_key, CopySource={"Bucket": self.bucket, "Key": key})
+        client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> PresignedUpload:
+        # POST firmado: S3 rechaza la subida si no cumple tipo y rango de tamaño
+        post = get_s3_client().generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_size]],
+            ExpiresIn=expires_in,
+        )
+        return PresignedUpload(url=post["url"], method="POST", fields=post["fields"])
+
+    def url_for(self, key: str) -> str:
+        if settings.S3_PUBLIC_URL:
+            return f"{settings.S3_PUBLIC_URL.rstrip('/')}/{key}"
+        return f"https://{self.bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+
+@lru_cache(maxsize=1)
+def get_gcs_client():
+    """Cliente de Cloud Storage único por proceso."""
+    try:
+        from google.cloud import storage as gcs
+    except ImportError as e:
+        raise RuntimeError("STORAGE_MODE=gcs requiere el paquete 'google-cloud-storage'.") from e
+    return gcs.Client()
+
+
+class GCSStorage(StorageBackend):
+    def __init__(self, bucket: str):
+        self.bucket_name = bucket
+
+    @property
+    def bucket(self):
+        return get_gcs_client().bucket(self.bucket_name)
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        blob = self.bucket.blob(key, chunk_size=settings.STORAGE_CHUNK_SIZE)
+        blob.upload_from_file(fileobj, content_type=content_type)
+        return self.url_for(key)
+
+    def download(self, key: str) -> bytes:
+        return self.bucket.blob(key).download_as_bytes()
+
+    def delete(self, key: str) -> None:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self.bucket.blob(key).delete()
+        except NotFound:
+            pass # Igual que S3: borrar un objeto inexistente no es un error
+
+    def stat(self, key: str) -> Optional[ObjectInfo]:
+        blob = self.bucket.get_blob(key)
+        if blob is None:
+            return None
+        return ObjectInfo(key=key, size=blob.size, content_type=blob.content_type)
+
+    def iter_objects(self, prefix: str) -> Iterator[ObjectInfo]:
+        blobs = get_gcs_client().list_blobs(self.bucket_name, prefix=f"{prefix.rstrip('/')}/", page_size=1000)
+        for blob in blobs:
+            yield ObjectInfo(key=blob.name, size=blob.size, content_type=blob.content_type, updated=blob.updated)
+
+    def move(self, key: str, new_key: str) -> None:
+        bucket = self.bucket
+        blob = bucket.blob(key)
+        bucket.copy_blob(blob, bucket, new_key)
+        blob.delete()
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> PresignedUpload:
+        headers = {"Content-Type": content_type, "x-goog-content-length-range": f"1,{max_size}"}
+        url = self.bucket.blob(key).generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expires_in),
+            method="PUT",
+            content_type=content_type,
+            headers={"x-goog-content-length-range": headers["x-goog-content-length-range"]},
+        )
+        return PresignedUpload(url=url, method="PUT", headers=headers)
+
+    def url_for(self, key: str) -> str:
+        return f"https://storage.googleapis.com/{self.bucket_name}/{key}"
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """Devuelve el backend configurado en STORAGE_MODE (instancia única por proceso)."""
+    mode = settings.STORAGE_MODE.lower()
+    if mode == "s3":
+        if not settings.S3_BUCKET_NAME:
+            raise RuntimeError("STORAGE_MODE=s3 requiere S3_BUCKET_NAME.")
+        return S3Storage(settings.S3_BUCKET_NAME)
+    if mode == "gcs":
+        if not settings.GCS_BUCKET_NAME:
+            raise RuntimeError("STORAGE_MODE=gcs requiere GCS_BUCKET_NAME.")
+        return GCSStorage(settings.GCS_BUCKET_NAME)
+    if mode != "local":
+        logger.warning(f"STORAGE_MODE desconocido '{settings.STORAGE_MODE}', usando almacenamiento local.")
+    return LocalStorage(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_URL)
+
+
+def build_key(destination: str, filename: str | None) -> str:
+    """Genera una key única conservando la extensión del archivo original."""
+    if ".." in destination or destination.startswith("/"):
+        raise ValueError(f"Carpeta de destino no válida: {destination}")
+    extension = "bin"
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+    return f"{destination.strip('/')}/{uuid.uuid4().hex}.{extension}"
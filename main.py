@@ -1,8 +1,10 @@
 # main.py (en la raíz del proyecto)
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from mangum import Mangum # Para AWS Lambda
 import uvicorn
+import os
 from app.api.v1.router import api_router
 from app.core.config import settings
 # from app.db.session import engine # Opcional: si necesitas interactuar con engine directamente
@@ -42,6 +44,11 @@ if settings.BACKEND_CORS_ORIGINS:
 # Incluir el router de la API v1
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Servir archivos subidos en modo local (en S3/GCS se sirven desde el bucket)
+if settings.STORAGE_MODE == "local":
+    os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(settings.LOCAL_STORAGE_URL, StaticFiles(directory=settings.LOCAL_STORAGE_DIR), name="uploads")
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
@@ -0,0 +1,150 @@
+# manage.py
+"""
+Tareas de mantenimiento (ejecutar desde la raíz del proyecto):
+    python manage.py <comando> [opciones]
+"""
+import argparse
+import logging
+from datetime import date, datetime, timedelta, timezone
+from app.db.session import SessionLocal
+from app.db.partitions import ensure_monthly_partitions
+from app.core.config import settings
+from app import services
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+def procesar_imagenes(db, args):
+    procesados = services.service_archivo.process_pending(db, limit=args.limite)
+    print(f"Archivos procesados: {procesados}")
+
+def eliminar_archivos(db, args):
+    eliminados, fallidos = services.service_archivo.drain_deletions(db, batch_size=args.lote)
+    print(f"Archivos eliminados: {eliminados}. Con error (se reintentarán): {fallidos}")
+
+def barrer_huerfanos(db, args):
+    reporte = services.service_archivo.sweep_orphans(
+        db, grace_hours=args.gracia_horas, quarantine=not args.eliminar, dry_run=args.simular
+    )
+    mb = reporte["bytes_recuperados"] / (1024 * 1024)
+    print(f"Revisados: {reporte['revisados']}. Huérfanos: {reporte['huerfanos']}. "
+          f"Recuperado: {mb:.2f} MB. Errores: {reporte['errores']}")
+
+def foto_inventario(db, args):
+    filas = services.service_inventario.take_snapshot(db)
+    print(f"Foto de inventario guardada: {filas} registros")
+
+def reconstruir_fotos(db, args):
+    hasta = args.hasta or datetime.now(timezone.utc).date() - timedelta(days=1)
+    fechas = services.service_inventario.backfill_snapshots(db, args.desde, hasta, mensual=args.mensual)
+    print(f"Fotos históricas procesadas: {fechas} fechas")
+
+def crear_particiones(db, args):
+    creadas = ensure_monthly_partitions(db, "movimientos", meses_adelante=args.meses)
+    print(f"Particiones creadas: {', '.join(creadas) if creadas else 'ninguna (ya existían)'}")
+
+def conciliar_inventario(db, args):
+    ejecucion, diferencias = services.service_conciliacion.reconcile_inventory(
+        db, almacen_ids=args.almacen or None, workers=args.hilos, corregir=args.corregir
+    )
+    print(f"Conciliación {ejecucion}: {len(diferencias)} diferencias")
+    for d in diferencias:
+        print(f"  Alm={d.almacen_id} Pres={d.presentacion_id} Inventario={d.cantidad_inventario} "
+              f"Libro={d.cantidad_libro} Dif={d.diferencia:+d}{' (corregida)' if d.corregido else ''}")
+
+def archivar_ventas(db, args):
+    totales = services.service_archivado.archive_closed_sales(
+        db, meses=args.meses, batch_size=args.lote, max_batches=args.max_lotes
+    )
+    print("Filas archivadas: " + ", ".join(f"{tabla}={n}" for tabla, n in totales.items()))
+
+def refrescar_rendimiento(db, args):
+    services.service_lote.refresh_rendimiento(db)
+    print("Vista lote_rendimiento actualizada")
+
+def regenerar_ventas_diarias(db, args):
+    filas = services.service_reporte.rebuild_ventas_diarias(db, desde=args.desde)
+    print(f"ventas_diarias regenerada: {filas} filas")
+
+def calcular_frecuencias(db, args):
+    clientes = services.service_pronostico.compute_frecuencias(db, historial=args.historial)
+    print(f"Frecuencia de compra recalculada para {clientes} clientes")
+
+def pronosticar_reposicion(db, args):
+    resumen = services.service_pronostico.forecast_reposicion(db)
+    print(f"Clientes: {resumen['clientes']}. Con pronóstico: {resumen['con_pronostico']}. "
+          f"Atrasados: {resumen['atrasados']}")
+
+def pronosticar_demanda(db, args):
+    resumen = services.service_pronostico.refresh_pronostico_demanda(db, completo=args.completo)
+    print(f"Pronóstico de demanda: {resumen['series']} series, {resumen['dias']} días nuevos")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tareas de mantenimiento de Manngo API")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p = subparsers.add_parser("procesar-imagenes", help="Deduplica y genera variantes de archivos pendientes")
+    p.add_argument("--limite", type=int, default=100, help="Máximo de registros por tipo")
+    p.set_defaults(func=procesar_imagenes)
+
+    p = subparsers.add_parser("eliminar-archivos", help="Procesa la outbox de archivos a eliminar")
+    p.add_argument("--lote", type=int, default=None, help="Tamaño de lote (por defecto OUTBOX_BATCH_SIZE)")
+    p.set_defaults(func=eliminar_archivos)
+
+    p = subparsers.add_parser("barrer-huerfanos", help="Elimina archivos que ningún pago/presentación referencia")
+    p.add_argument("--gracia-horas", type=int, default=None, help="Antigüedad mínima (por defecto SWEEPER_GRACE_HOURS)")
+    p.add_argument("--eliminar", action="store_true", help="Eliminar en vez de mover a cuarentena/")
+    p.add_argument("--simular", action="store_true", help="Solo reportar, sin tocar el almacenamiento")
+    p.set_defaults(func=barrer_huerfanos)
+
+    p = subparsers.add_parser("foto-inventario", help="Guarda la foto diaria del inventario (programar cada noche)")
+    p.set_defaults(func=foto_inventario)
+
+    p = subparsers.add_parser("reconstruir-fotos", help="Genera fotos históricas a partir de los movimientos")
+    p.add_argument("--desde", type=date.fromisoformat, required=True, help="Fecha inicial (AAAA-MM-DD)")
+    p.add_argument("--hasta", type=date.fromisoformat, default=None, help="Fecha final (por defecto ayer)")
+    p.add_argument("--mensual", action="store_true", help="Solo fotos de fin de mes")
+    p.set_defaults(func=reconstruir_fotos)
+
+    p = subparsers.add_parser("crear-particiones", help="Crea las particiones mensuales futuras de movimientos")
+    p.add_argument("--meses", type=int, default=settings.PARTICIONES_MESES_ADELANTE, help="Meses por adelantado")
+    p.set_defaults(func=crear_particiones)
+
+    p = subparsers.add_parser("conciliar-inventario", help="Compara inventario con el libro de movimientos")
+    p.add_argument("--almacen", type=int, action="append", help="ID de almacén (repetible; por defecto todos)")
+    p.add_argument("--hilos", type=int, default=4, help="Almacenes procesados en paralelo")
+    p.add_argument("--corregir", action="store_true", help="Ajustar el libro en las diferencias repetidas en dos corridas seguidas")
+    p.set_defaults(func=conciliar_inventario)
+
+    p = subparsers.add_parser("archivar-ventas", help="Mueve ventas pagadas antiguas (con sus detalles y pagos) al archivo")
+    p.add_argument("--meses", type=int, default=None, help="Antigüedad mínima (por defecto ARCHIVO_MESES_RETENCION)")
+    p.add_argument("--lote", type=int, default=500, help="Ventas por transacción")
+    p.add_argument("--max-lotes", type=int, default=None, help="Detenerse tras N lotes (para ventanas de mantenimiento)")
+    p.set_defaults(func=archivar_ventas)
+
+    p = subparsers.add_parser("refrescar-rendimiento", help="Recalcula la vista de rendimiento de lotes (programar cada noche)")
+    p.set_defaults(func=refrescar_rendimiento)
+
+    p = subparsers.add_parser("regenerar-ventas-diarias", help="Reconstruye el resumen diario de ventas")
+    p.add_argument("--desde", type=date.fromisoformat, default=None, help="Solo desde esta fecha (AAAA-MM-DD)")
+    p.set_defaults(func=regenerar_ventas_diarias)
+
+    p = subparsers.add_parser("calcular-frecuencias", help="Recalcula frecuencia y consumo de cada cliente desde sus compras")
+    p.add_argument("--historial", type=int, default=services.service_pronostico.HISTORIAL_COMPRAS, help="Intervalos recientes por cliente")
+    p.set_defaults(func=calcular_frecuencias)
+
+    p = subparsers.add_parser("pronosticar-reposicion", help="Calcula la próxima compra esperada de cada cliente (programar cada noche)")
+    p.set_defaults(func=pronosticar_reposicion)
+
+    p = subparsers.add_parser("pronosticar-demanda", help="Actualiza el pronóstico de demanda a 4 semanas (programar cada noche)")
+    p.add_argument("--completo", action="store_true", help="Recalcular desde cero en lugar de incremental")
+    p.set_defaults(func=pronosticar_demanda)
+
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        args.func(db, args)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
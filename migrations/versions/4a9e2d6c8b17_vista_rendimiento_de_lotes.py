@@ -0,0 +1,56 @@
+"""Vista materializada de rendimiento de lotes
+
+Revision ID: 4a9e2d6c8b17
+Revises: e17a4c9b3f05
+Create Date: 2026-10-19 15:14:08.327791
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a9e2d6c8b17'
+down_revision = 'e17a4c9b3f05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Alembic no detecta vistas materializadas: migración manual
+    op.execute("""
+        CREATE MATERIALIZED VIEW lote_rendimiento AS
+        SELECT
+            l.id AS lote_id,
+            l.producto_id,
+            l.proveedor_id,
+            l.fecha_ingreso,
+            l.peso_humedo_kg,
+            l.peso_seco_kg,
+            l.cantidad_disponible_kg,
+            coalesce(m.merma_kg, 0) AS merma_kg,
+            coalesce(m.briquetas_kg, 0) AS briquetas_kg,
+            coalesce(m.num_mermas, 0) AS num_mermas,
+            coalesce(v.vendido_kg, 0) AS vendido_kg,
+            round(l.peso_seco_kg / nullif(l.peso_humedo_kg, 0), 4) AS rendimiento_secado,
+            round((coalesce(l.peso_seco_kg, l.peso_humedo_kg) - coalesce(m.merma_kg, 0)) / nullif(l.peso_humedo_kg, 0), 4) AS rendimiento_neto
+        FROM lotes l
+        LEFT JOIN (
+            SELECT lote_id,
+                   sum(cantidad_kg) AS merma_kg,
+                   sum(cantidad_kg) FILTER (WHERE convertido_a_briquetas) AS briquetas_kg,
+                   count(*) AS num_mermas
+            FROM mermas GROUP BY lote_id
+        ) m ON m.lote_id = l.id
+        LEFT JOIN (
+            SELECT lote_id, sum(cantidad_kg) AS vendido_kg
+            FROM venta_detalle_lotes GROUP BY lote_id
+        ) v ON v.lote_id = l.id
+    """)
+    # Índice único: requisito de REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX idx_lote_rendimiento_lote ON lote_rendimiento (lote_id)")
+    op.execute("CREATE INDEX idx_lote_rendimiento_proveedor ON lote_rendimiento (proveedor_id, producto_id)")
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW lote_rendimiento")
@@ -0,0 +1,106 @@
+"""Particionar movimientos por mes
+
+Revision ID: 9a6c3f1e8b20
+Revises: 5e8d2b7a9c14
+Create Date: 2026-10-19 12:31:06.884517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a6c3f1e8b20'
+down_revision = '5e8d2b7a9c14'
+branch_labels = None
+depends_on = None
+
+MESES_ADELANTE = 3
+
+
+def upgrade():
+    # Migración manual: Alembic no genera el cambio a tabla particionada
+    op.execute("ALTER TABLE movimientos RENAME TO movimientos_old")
+    op.execute("ALTER TABLE movimientos_old RENAME CONSTRAINT movimientos_pkey TO movimientos_old_pkey")
+    op.execute("ALTER INDEX idx_movimiento_almacen_fecha RENAME TO idx_movimiento_almacen_fecha_old")
+    op.execute("UPDATE movimientos_old SET fecha = now() WHERE fecha IS NULL")
+
+    op.execute("""
+        CREATE TABLE movimientos (
+            id integer NOT NULL DEFAULT nextval('movimientos_id_seq'),
+            tipo varchar(10) NOT NULL,
+            presentacion_id integer REFERENCES presentaciones_producto (id) ON DELETE CASCADE,
+            lote_id integer REFERENCES lotes (id) ON DELETE SET NULL,
+            usuario_id integer REFERENCES users (id),
+            almacen_id integer REFERENCES almacenes (id) ON DELETE SET NULL,
+            cantidad numeric(12, 2) NOT NULL,
+            fecha timestamptz NOT NULL,
+            motivo varchar(255),
+            PRIMARY KEY (id, fecha),
+            CHECK (tipo IN ('entrada', 'salida')),
+            CHECK (cantidad > 0)
+        ) PARTITION BY RANGE (fecha)
+    """)
+    op.execute("ALTER SEQUENCE movimientos_id_seq OWNED BY movimientos.id")
+    op.execute("CREATE INDEX idx_movimiento_almacen_fecha ON movimientos (almacen_id, presentacion_id, fecha)")
+
+    # Una partición por mes desde el movimiento más antiguo hasta MESES_ADELANTE meses en el futuro
+    op.execute(f"""
+        DO $$
+        DECLARE
+            inicio date;
+        BEGIN
+            FOR inicio IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce((SELECT min(fecha) FROM movimientos_old), now()) AT TIME ZONE 'UTC'),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MESES_ADELANTE} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF movimientos FOR VALUES FROM (%L) TO (%L)',
+                    'movimientos_' || to_char(inicio, 'YYYY_MM'),
+                    inicio::text || ' 00:00:00+00',
+                    (inicio + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE movimientos_default PARTITION OF movimientos DEFAULT")
+
+    op.execute("""
+        INSERT INTO movimientos (id, tipo, presentacion_id, lote_id, usuario_id, almacen_id, cantidad, fecha, motivo)
+        SELECT id, tipo, presentacion_id, lote_id, usuario_id, almacen_id, cantidad, fecha, motivo
+        FROM movimientos_old
+    """)
+    op.execute("DROP TABLE movimientos_old")
+
+
+def downgrade():
+    op.execute("ALTER TABLE movimientos RENAME TO movimientos_part")
+    op.execute("ALTER TABLE movimientos_part RENAME CONSTRAINT movimientos_pkey TO movimientos_part_pkey")
+    op.execute("ALTER INDEX idx_movimiento_almacen_fecha RENAME TO idx_movimiento_almacen_fecha_part")
+    op.execute("""
+        CREATE TABLE movimientos (
+            id integer NOT NULL DEFAULT nextval('movimientos_id_seq'),
+            tipo varchar(10) NOT NULL,
+            presentacion_id integer REFERENCES presentaciones_producto (id) ON DELETE CASCADE,
+            lote_id integer REFERENCES lotes (id) ON DELETE SET NULL,
+            usuario_id integer REFERENCES users (id),
+            almacen_id integer,
+            cantidad numeric(12, 2) NOT NULL,
+            fecha timestamptz,
+            motivo varchar(255),
+            PRIMARY KEY (id),
+            CHECK (tipo IN ('entrada', 'salida')),
+            CHECK (cantidad > 0)
+        )
+    """)
+    op.execute("""
+        ALTER TABLE movimientos ADD CONSTRAINT movimientos_almacen_id_fkey
+        FOREIGN KEY (almacen_id) REFERENCES almacenes (id) ON DELETE SET NULL
+    """)
+    op.execute("ALTER SEQUENCE movimientos_id_seq OWNED BY movimientos.id")
+    op.execute("INSERT INTO movimientos SELECT id, tipo, presentacion_id, lote_id, usuario_id, almacen_id, cantidad, fecha, motivo FROM movimientos_part")
+    op.execute("DROP TABLE movimientos_part") # Elimina también sus particiones
+    op.execute("CREATE INDEX idx_movimiento_almacen_fecha ON movimientos (almacen_id, presentacion_id, fecha)")
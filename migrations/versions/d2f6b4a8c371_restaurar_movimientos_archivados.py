@@ -0,0 +1,40 @@
+"""Restaurar movimientos archivados
+
+Revision ID: d2f6b4a8c371
+Revises: c7e3a9d15f28
+Create Date: 2026-10-20 10:41:05.336720
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6b4a8c371'
+down_revision = 'c7e3a9d15f28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los movimientos dejan de archivarse (el kardex y el stock a una fecha necesitan el libro
+    # completo): los ya archivados vuelven a movimientos. El archivo no tiene claves foráneas,
+    # así que las referencias a filas que ya no existen quedan en NULL
+    op.execute("""
+        INSERT INTO movimientos (id, tipo, presentacion_id, lote_id, usuario_id, almacen_id, cantidad, fecha, motivo)
+        SELECT m.id, m.tipo, m.presentacion_id,
+               l.id, u.id, a.id,
+               m.cantidad, m.fecha, m.motivo
+        FROM movimientos_archivo m
+        JOIN presentaciones_producto p ON p.id = m.presentacion_id
+        LEFT JOIN lotes l ON l.id = m.lote_id
+        LEFT JOIN users u ON u.id = m.usuario_id
+        LEFT JOIN almacenes a ON a.id = m.almacen_id
+    """)
+    op.execute("DROP TABLE movimientos_archivo")
+
+
+def downgrade():
+    op.execute("CREATE TABLE movimientos_archivo (LIKE movimientos INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE movimientos_archivo ADD COLUMN archivado_en timestamptz NOT NULL DEFAULT now()")
+    op.execute("CREATE INDEX idx_movimientos_archivo_almacen_fecha ON movimientos_archivo (almacen_id, presentacion_id, fecha)")
@@ -0,0 +1,70 @@
+"""Rendimiento de lotes incluye ventas archivadas
+
+Revision ID: e9b1d7c42a60
+Revises: d2f6b4a8c371
+Create Date: 2026-10-20 11:03:52.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b1d7c42a60'
+down_revision = 'd2f6b4a8c371'
+branch_labels = None
+depends_on = None
+
+_VISTA = """
+    CREATE MATERIALIZED VIEW lote_rendimiento AS
+    SELECT
+        l.id AS lote_id,
+        l.producto_id,
+        l.proveedor_id,
+        l.fecha_ingreso,
+        l.peso_humedo_kg,
+        l.peso_seco_kg,
+        l.cantidad_disponible_kg,
+        coalesce(m.merma_kg, 0) AS merma_kg,
+        coalesce(m.briquetas_kg, 0) AS briquetas_kg,
+        coalesce(m.num_mermas, 0) AS num_mermas,
+        coalesce(v.vendido_kg, 0) AS vendido_kg,
+        round(l.peso_seco_kg / nullif(l.peso_humedo_kg, 0), 4) AS rendimiento_secado,
+        round((coalesce(l.peso_seco_kg, l.peso_humedo_kg) - coalesce(m.merma_kg, 0)) / nullif(l.peso_humedo_kg, 0), 4) AS rendimiento_neto
+    FROM lotes l
+    LEFT JOIN (
+        SELECT lote_id,
+               sum(cantidad_kg) AS merma_kg,
+               sum(cantidad_kg) FILTER (WHERE convertido_a_briquetas) AS briquetas_kg,
+               count(*) AS num_mermas
+        FROM mermas GROUP BY lote_id
+    ) m ON m.lote_id = l.id
+    LEFT JOIN (
+        SELECT lote_id, sum(cantidad_kg) AS vendido_kg
+        FROM ({asignaciones}) a GROUP BY lote_id
+    ) v ON v.lote_id = l.id
+"""
+
+# Las asignaciones de ventas archivadas siguen contando como vendidas
+_CON_ARCHIVO = """
+            SELECT lote_id, cantidad_kg FROM venta_detalle_lotes
+            UNION ALL
+            SELECT lote_id, cantidad_kg FROM venta_detalle_lotes_archivo
+"""
+_SIN_ARCHIVO = "SELECT lote_id, cantidad_kg FROM venta_detalle_lotes"
+
+
+def _crear_vista(asignaciones):
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS lote_rendimiento")
+    op.execute(_VISTA.format(asignaciones=asignaciones))
+    # Índice único: requisito de REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX idx_lote_rendimiento_lote ON lote_rendimiento (lote_id)")
+    op.execute("CREATE INDEX idx_lote_rendimiento_proveedor ON lote_rendimiento (proveedor_id, producto_id)")
+
+
+def upgrade():
+    _crear_vista(_CON_ARCHIVO)
+
+
+def downgrade():
+    _crear_vista(_SIN_ARCHIVO)
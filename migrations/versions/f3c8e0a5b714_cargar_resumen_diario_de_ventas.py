@@ -0,0 +1,46 @@
+"""Cargar resumen diario de ventas
+
+Revision ID: f3c8e0a5b714
+Revises: e9b1d7c42a60
+Create Date: 2026-10-20 11:20:46.902175
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8e0a5b714'
+down_revision = 'e9b1d7c42a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ventas_diarias se creó vacía: se carga con todo el historial (incluidas las ventas
+    # archivadas). Regenerar completa también corrige filas descuadradas por reversiones
+    # registradas con el día en la zona horaria de la conexión en lugar de UTC
+    op.execute("DELETE FROM ventas_diarias")
+    op.execute("""
+        INSERT INTO ventas_diarias (fecha, almacen_id, vendedor_id, presentacion_id, num_ventas, unidades, kg, monto)
+        SELECT (v.fecha AT TIME ZONE 'UTC')::date, v.almacen_id, v.vendedor_id, d.presentacion_id,
+               count(DISTINCT v.id), sum(d.cantidad), sum(d.cantidad * p.capacidad_kg), sum(d.cantidad * d.precio_unitario)
+        FROM (
+            SELECT id, fecha, almacen_id, vendedor_id FROM ventas
+            UNION ALL
+            SELECT id, fecha, almacen_id, vendedor_id FROM ventas_archivo
+        ) v
+        JOIN (
+            SELECT venta_id, presentacion_id, cantidad, precio_unitario FROM venta_detalles
+            UNION ALL
+            SELECT venta_id, presentacion_id, cantidad, precio_unitario FROM venta_detalles_archivo
+        ) d ON d.venta_id = v.id
+        JOIN presentaciones_producto p ON p.id = d.presentacion_id
+        WHERE v.vendedor_id IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade():
+    # Los datos se conservan: la tabla la elimina la migración 6d0f3b8a2e49
+    pass
@@ -0,0 +1,65 @@
+# tests/test_partitions.py
+"""Requiere PostgreSQL: definir TEST_DATABASE_URL (se usa un esquema temporal)."""
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.db.partitions import add_months, ensure_monthly_partitions
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL no definida")
+
+
+@pytest.fixture
+def db():
+    esquema = f"test_part_{uuid.uuid4().hex[:8]}"
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={esquema}"})
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {esquema}"))
+        conn.execute(text(f"SET search_path TO {esquema}"))
+        conn.execute(text(
+            "CREATE TABLE movimientos (id serial, fecha timestamptz NOT NULL, cantidad integer NOT NULL, "
+            "PRIMARY KEY (id, fecha)) PARTITION BY RANGE (fecha)"
+        ))
+        conn.execute(text("CREATE TABLE movimientos_default PARTITION OF movimientos DEFAULT"))
+    session = Session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {esquema} CASCADE"))
+        engine.dispose()
+
+
+def test_crea_particiones_faltantes(db):
+    mes_actual = datetime.now(timezone.utc).date().replace(day=1)
+    creadas = ensure_monthly_partitions(db, meses_adelante=1)
+    assert creadas == [f"movimientos_{mes_actual:%Y_%m}", f"movimientos_{add_months(mes_actual, 1):%Y_%m}"]
+    assert ensure_monthly_partitions(db, meses_adelante=1) == []
+
+
+def test_traslada_filas_de_default_al_crear_el_mes(db):
+    mes_actual = datetime.now(timezone.utc).date().replace(day=1)
+    mes_pasado = add_months(mes_actual, -1)
+    # El job no corrió: filas del mes pasado y del actual quedaron en DEFAULT
+    db.execute(text("INSERT INTO movimientos (fecha, cantidad) VALUES (:a, 1), (:a, 2), (:b, 3)"), {
+        "a": datetime(mes_pasado.year, mes_pasado.month, 15, tzinfo=timezone.utc),
+        "b": datetime(mes_actual.year, mes_actual.month, 2, tzinfo=timezone.utc),
+    })
+    db.commit()
+
+    creadas = ensure_monthly_partitions(db, meses_adelante=0, desde=mes_pasado)
+
+    assert creadas == [f"movimientos_{mes_pasado:%Y_%m}", f"movimientos_{mes_actual:%Y_%m}"]
+    assert db.execute(text("SELECT count(*) FROM movimientos_default")).scalar() == 0
+    assert db.execute(text(f"SELECT sum(cantidad) FROM movimientos_{mes_pasado:%Y_%m}")).scalar() == 3
+    assert db.execute(text(f"SELECT sum(cantidad) FROM movimientos_{mes_actual:%Y_%m}")).scalar() == 3
+    # DEFAULT vuelve a estar adjunta y sigue recibiendo lo que caiga fuera de rango
+    db.execute(text("INSERT INTO movimientos (fecha, cantidad) VALUES ('2000-01-01 00:00:00+00', 9)"))
+    assert db.execute(text("SELECT count(*) FROM movimientos_default")).scalar() == 1
+    db.rollback()
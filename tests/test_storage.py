@@ -0,0 +1,140 @@
+# tests/test_storage.py
+import io
+import os
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.utils import storage
+from app.utils.storage import (
+    LocalStorage, S3Storage, StorageBackend, issue_upload_token, sign_upload_token, verify_local_upload,
+    verify_upload_token,
+)
+
+CONTENIDO = b"\x89PNG" + b"x" * 2048
+
+
+def test_backend_base_es_abstracto():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_token_de_subida_ligado_a_key_usuario_y_carpeta():
+    token = issue_upload_token("comprobantes/a.png", 7, "comprobantes")
+    assert verify_upload_token(token, "comprobantes/a.png", 7, "comprobantes")
+    assert not verify_upload_token(token, "comprobantes/b.png", 7, "comprobantes")
+    assert not verify_upload_token(token, "comprobantes/a.png", 8, "comprobantes")
+    assert not verify_upload_token(token, "comprobantes/a.png", 7, "presentaciones")
+    assert not verify_upload_token("basura", "comprobantes/a.png", 7, "comprobantes")
+
+
+def test_token_de_subida_expirado():
+    token = sign_upload_token("comprobantes/a.png", 7, "comprobantes", expires=1)
+    assert not verify_upload_token(token, "comprobantes/a.png", 7, "comprobantes")
+
+
+# --- LocalStorage ---
+
+@pytest.fixture
+def local(tmp_path):
+    return LocalStorage(str(tmp_path), "/uploads")
+
+
+def test_local_upload_y_stat(local, tmp_path):
+    url = local.upload_fileobj(io.BytesIO(CONTENIDO), "comprobantes/a.png", "image/png")
+    assert url == "/uploads/comprobantes/a.png"
+    assert (tmp_path / "comprobantes" / "a.png").read_bytes() == CONTENIDO
+    assert not (tmp_path / "comprobantes" / "a.png.part").exists()
+
+    info = local.stat("comprobantes/a.png")
+    assert info.size == len(CONTENIDO)
+    assert info.content_type == "image/png"
+    assert local.stat("comprobantes/no-existe.png") is None
+
+
+def test_local_key_fuera_del_directorio(local):
+    with pytest.raises(ValueError):
+        local.upload_fileobj(io.BytesIO(CONTENIDO), "../fuera.png")
+
+
+def test_local_presign(local):
+    subida = local.presign_upload("comprobantes/a.png", "image/png", 1024, expires_in=60)
+    assert subida.method == "PUT"
+    assert subida.headers == {"Content-Type": "image/png"}
+    url = urlparse(subida.url)
+    assert url.path.endswith("/uploads/local/comprobantes/a.png")
+    q = {k: v[0] for k, v in parse_qs(url.query).items()}
+    assert verify_local_upload("comprobantes/a.png", q["content_type"], int(q["max_size"]), int(q["expires"]), q["signature"])
+    # Cualquier cambio invalida la firma
+    assert not verify_local_upload("comprobantes/b.png", q["content_type"], int(q["max_size"]), int(q["expires"]), q["signature"])
+    assert not verify_local_upload("comprobantes/a.png", q["content_type"], 10 ** 9, int(q["expires"]), q["signature"])
+
+
+def test_local_presign_expirado(local):
+    subida = local.presign_upload("comprobantes/a.png", "image/png", 1024, expires_in=-1)
+    q = {k: v[0] for k, v in parse_qs(urlparse(subida.url).query).items()}
+    assert not verify_local_upload("comprobantes/a.png", q["content_type"], int(q["max_size"]), int(q["expires"]), q["signature"])
+
+
+def test_local_move_y_delete(local, tmp_path):
+    local.upload_fileobj(io.BytesIO(CONTENIDO), "comprobantes/a.png")
+    local.move("comprobantes/a.png", "cuarentena/comprobantes/a.png")
+    assert local.stat("comprobantes/a.png") is None
+    assert local.download("cuarentena/comprobantes/a.png") == CONTENIDO
+    assert [o.key for o in local.iter_objects("cuarentena")] == ["cuarentena/comprobantes/a.png"]
+
+    local.delete("cuarentena/comprobantes/a.png")
+    assert local.stat("cuarentena/comprobantes/a.png") is None
+    local.delete("cuarentena/comprobantes/a.png") # Borrar dos veces no es un error
+
+
+def test_local_key_from_url(local):
+    assert local.key_from_url("/uploads/comprobantes/a.png") == "comprobantes/a.png"
+    assert local.key_from_url("https://otro.dominio/a.png") is None
+
+
+# --- S3Storage (moto) ---
+
+BUCKET = "manngo-test"
+
+
+@pytest.fixture
+def s3():
+    moto = pytest.importorskip("moto")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        storage.get_s3_client.cache_clear()
+        storage.get_s3_client().create_bucket(Bucket=BUCKET)
+        yield S3Storage(BUCKET)
+    storage.get_s3_client.cache_clear()
+
+
+def test_s3_upload_y_stat(s3):
+    url = s3.upload_fileobj(io.BytesIO(CONTENIDO), "comprobantes/a.png", "image/png")
+    assert url.endswith("/comprobantes/a.png")
+    assert s3.key_from_url(url) == "comprobantes/a.png"
+
+    info = s3.stat("comprobantes/a.png")
+    assert info.size == len(CONTENIDO)
+    assert info.content_type == "image/png"
+    assert s3.stat("comprobantes/no-existe.png") is None
+
+
+def test_s3_presign(s3):
+    subida = s3.presign_upload("comprobantes/a.png", "image/png", 1024, expires_in=60)
+    assert subida.method == "POST"
+    assert subida.fields["key"] == "comprobantes/a.png"
+    assert subida.fields["Content-Type"] == "image/png"
+    assert "policy" in subida.fields
+
+
+def test_s3_move_y_delete(s3):
+    s3.upload_fileobj(io.BytesIO(CONTENIDO), "comprobantes/a.png", "image/png")
+    s3.move("comprobantes/a.png", "cuarentena/comprobantes/a.png")
+    assert s3.stat("comprobantes/a.png") is None
+    assert s3.download("cuarentena/comprobantes/a.png") == CONTENIDO
+    assert [o.key for o in s3.iter_objects("cuarentena")] == ["cuarentena/comprobantes/a.png"]
+
+    s3.delete("cuarentena/comprobantes/a.png")
+    assert s3.stat("cuarentena/comprobantes/a.png") is None